@@ -0,0 +1,459 @@
+# dataset.py
+# 데이터 스냅샷 1개에서 파생되는 읽기 전용 상태 — 인덱스, KDTree, 사전 직렬화 응답
+#
+# 요청 처리 중에는 절대 수정하지 않음. 핫 리로드는 새 Dataset을 별도로 완성한 뒤
+# main.py의 참조 하나만 교체 → 요청은 항상 한 버전의 완성된 상태만 봄
+#
+# 사전 직렬화 응답(payload/scatter)은 스냅샷에도 저장 ('derived' 테이블):
+# 스냅샷으로 시작한 워커는 이를 mmap 그대로 사용 → 워커 수가 늘어도 응답 bytes는 1벌만 메모리에 존재
+# 응답 형식 코드(이 파일)가 바뀌면 CODE_VERSION이 달라져 저장된 payload 대신 다시 생성
+#
+# ETag·정적 내보내기 디렉터리는 데이터 해시(version)와 응답 코드 해시(RESPONSE_VERSION)를 함께 사용:
+# CSV가 그대로여도 응답 형태를 정하는 코드(main.py의 /ranking 행 구성 등)가 바뀌면 캐시 키가 달라짐
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from gazetteer import Gazetteer
+from ranking_index import RankingIndex
+from scoring import ScoreModel
+from spatial import GridIndex
+from snapshot import LOADER_VERSION, load_csv, load_data, write_snapshot
+
+with open(__file__, 'rb') as _f:
+    CODE_VERSION = hashlib.sha256(_f.read()).hexdigest()[:12]
+
+RESPONSE_FILES = ("main.py", "dataset.py", "ranking_index.py")  # 응답 bytes를 만드는 코드 (+ 로더 코드)
+
+
+def _response_version() -> str:
+    """응답 형태를 정하는 코드 해시 — LOADER_VERSION(CSV → 테이블)까지 포함"""
+    h = hashlib.sha256(LOADER_VERSION.encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in RESPONSE_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:8]
+
+
+RESPONSE_VERSION = _response_version()
+
+# 사분면 라벨 접두어 — 필터 파라미터(quadrant=Q1,Q2)와 quadrant_id 배열의 기준
+QUADRANTS = ('Q1', 'Q2', 'Q3', 'Q4')
+
+# 수요 요인 (레이더 차트 subject → 컬럼 접두어 — '{접두어}_pct' / '{접두어}_raw')
+DEMAND_FACTORS = (
+    ("집객시설", "집객시설_수"),
+    ("직장인구", "총_직장_인구_수"),
+    ("소득금액", "월_평균_소득_금액"),
+    ("가구수", "총_가구_수"),
+    ("검색지수", "카페_검색지수"),
+    ("지하철", "지하철_노선_수"),
+)
+
+_LINE_NAMES = r'(\d+호선|경의중앙선|신분당선|경춘선|수인분당선|공항철도|경강선|서해선)'
+
+def _format_subway(raw) -> str:
+    """지하철_역_목록 → '2호선 강남역, 9호선 신논현역' 형식으로 정리 (중복 제거)"""
+    if not raw or (isinstance(raw, float) and raw != raw):
+        return ''
+    tokens = re.findall(_LINE_NAMES + r'\s+(\S+역)', str(raw))
+    seen, result = set(), []
+    for line, station in tokens:
+        key = f"{line} {station}"
+        if key not in seen:
+            seen.add(key)
+            result.append(key)
+    return ', '.join(result)
+
+def _si(v, d=0):
+    """안전한 int 변환 (NaN/None → d)"""
+    try:
+        f = float(v)
+        return d if (f != f) else int(f)  # NaN check
+    except:
+        return d
+
+def _sf(v, d=0.0):
+    """안전한 float 변환 (NaN/None → d)"""
+    try:
+        f = float(v)
+        return d if (f != f) else f
+    except:
+        return d
+
+def json_bytes(obj) -> bytes:
+    """JSONResponse와 동일한 직렬화 (ensure_ascii=False, 공백 없음)"""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class Dataset:
+    """한 데이터 버전의 조회용 상태 (load_data 결과 → 인덱스/KDTree/응답 bytes)"""
+
+    def __init__(self, data: dict, load_ms: float = 0.0):
+        self.version = data["version"]   # CSV 내용 해시 — 스냅샷 기준
+        self.etag_version = f"{self.version}-{RESPONSE_VERSION}"  # 데이터 + 응답 코드 — ETag/정적 디렉터리 기준
+        self.source = data["source"]     # snapshot / csv / empty
+        self.load_ms = load_ms
+        self.ranking = data["ranking"]   # unified_ranking.csv 컬럼명 → 배열/문자열 리스트
+        self.n_ranking = len(self.ranking['상권_코드_명']) if self.ranking else 0
+
+        # KDTree 구성 — ranked 상권(unified_ranking.csv)만 사용해 항상 유효한 매핑 보장
+        self.leaf_names = data["map"]['상권_코드_명']
+        self.total_ranked = len(self.leaf_names)
+        if self.total_ranked:
+            map_coords = np.column_stack([data["map"]['엑스좌표_값'], data["map"]['와이좌표_값']])
+            self.tree = cKDTree(map_coords)
+        else:
+            self.tree = None
+        # 지도 영역 질의(/bbox)용 균일 격자 + 표시용 위경도
+        self.grid = GridIndex(data["map"]['엑스좌표_값'], data["map"]['와이좌표_값'])
+        self.leaf_lat = data["map"]['lat']
+        self.leaf_lon = data["map"]['lon']
+
+        # 위치 인덱스 — 요청마다 DataFrame boolean mask 스캔 대신 dict/배열 O(1) 조회
+        # 순위 동점은 CSV 상 첫 행 유지 (기존 .iloc[0] 동작과 동일)
+        self.names = self.ranking['상권_코드_명'] if self.n_ranking else []
+        self.pos_by_name, self.pos_by_code, self.pos_by_rank = {}, {}, {}
+        if self.n_ranking:
+            codes = self.ranking['상권_코드'].tolist()
+            ranks = self.ranking['unified_rank'].tolist()
+            for pos, name in enumerate(self.names):
+                self.pos_by_name.setdefault(name, pos)
+                self.pos_by_code.setdefault(int(codes[pos]), pos)
+                self.pos_by_rank.setdefault(int(ranks[pos]), pos)
+
+        # 찻집 위치 KDTree (TM 좌표) — 반경 내 찻집 검색, 지연이 전체 찻집 수와 무관
+        self.shops = data["shops"]
+        self.n_shops = len(self.shops["가게명"])
+        self.shop_tree = cKDTree(np.column_stack([self.shops["x"], self.shops["y"]])) if self.n_shops else None
+
+        # 상권_코드 → 찻집 가게명 tuple (teashops.csv 1회 그룹화, CSV 순서 유지)
+        tea = data["teashops"]
+        self.tea_names_by_code = {
+            int(code): tuple(tea["names"][tea["offsets"][i]:tea["offsets"][i + 1]])
+            for i, code in enumerate(tea["codes"])
+        }
+
+        # 지명 → TM 좌표 (카카오 호출 전 로컬 조회)
+        self.gazetteer = Gazetteer(data["places"])
+
+        # KDTree leaf(ranked 상권 좌표 행 번호) → ranking 위치 (-1: 랭킹 없음)
+        self.leaf_to_pos = np.array([self.pos_by_name.get(n, -1) for n in self.leaf_names], dtype=np.int64)
+
+        # 필터용 정수 배열 — quadrant_id[pos]: QUADRANTS 인덱스 (-1: 일반 상권 등)
+        quadrant_index = {q: i for i, q in enumerate(QUADRANTS)}
+        self.quadrant_id = np.array([quadrant_index.get(str(q).split('_')[0], -1)
+                                     for q in (self.ranking.get('사분면') or [])], dtype=np.int8)
+        self.rank = (self.ranking['unified_rank'].astype(np.int64) if self.n_ranking
+                     else np.empty(0, dtype=np.int64))
+
+        # 자치구 (to_map.csv) → ranking 위치 기준 + /ranking 목록용 bitmap/정렬 인덱스
+        self.gu = [None] * self.n_ranking
+        for leaf, gu in enumerate(data["map"].get('자치구_코드_명', [])):
+            if self.leaf_to_pos[leaf] >= 0:
+                self.gu[self.leaf_to_pos[leaf]] = gu
+        self.listing = RankingIndex(self.ranking, self.gu)
+
+        # 사용자 가중치 점수 재계산 (/rescore) — 분위수·인접 상권 CSR 미리 준비
+        self.scoring = ScoreModel(self.ranking, data["neighbors"])
+
+        # 분기별 점수·순위 (?as_of=) — 분기 × 상권 행렬 (scoring.score_quarters, 로드 시 계산/스냅샷 저장)
+        # quarter_order[qi]: 그 분기 순위순 ranking 위치 (데이터 없는 상권 제외, 동점은 원래 행 순서)
+        history = data["history"]
+        self.quarters = [int(q) for q in history["quarters"]]
+        self.quarter_index = {q: i for i, q in enumerate(self.quarters)}
+        self.history = history
+        self.quarter_order = []
+        for ranks in history["rank"]:
+            order = np.argsort(ranks, kind='stable')
+            self.quarter_order.append(order[ranks[order] > 0])
+        # 분기별 순위 상권 수 — total_ranked와 같은 기준 (KDTree leaf가 있는 상권만 셈)
+        mapped = np.zeros(self.n_ranking, dtype=np.bool_)
+        mapped[self.leaf_to_pos[self.leaf_to_pos >= 0]] = True
+        self.quarter_total = [int((ranks[mapped] > 0).sum()) for ranks in history["rank"]]
+        # 분기 사분면 id → 서비스 라벨 (Q1 → Q1_검증시장공백, 데이터 없으면 일반 상권)
+        labels = {str(q).split('_')[0]: str(q) for q in (self.ranking.get('사분면') or [])}
+        self.quadrant_labels = [labels.get(q, q) for q in QUADRANTS]
+
+        derived = data.get("derived")
+        if derived and derived.get("code_version") == [CODE_VERSION]:
+            # 스냅샷에 저장된 응답 bytes를 그대로 사용 (payload_tails: mmap slice, 워커 간 공유)
+            self.payload_tails = derived["payload_tails"]
+            self.scatter_body, self.scatter_body_gz = (bytes(b) for b in derived["scatter"])
+        else:
+            self._build_payloads()
+
+    def _build_payloads(self) -> None:
+        # 상권별 응답 JSON 사전 직렬화 — 응답은 상권에만 의존하므로 로드 시 1회 생성
+        # payload_tails[pos]: '"address":...,' 뒤에 이어지는 나머지 필드 bytes ('{' 제외)
+        columns = [c.tolist() if isinstance(c, np.ndarray) else c for c in self.ranking.values()]
+        self.payload_tails = []
+        for vals in zip(*columns):
+            row = dict(zip(self.ranking, vals))
+            body = self.make_result(row, str(row['상권_코드_명']))
+            del body['address']
+            self.payload_tails.append(json_bytes(body)[1:])
+
+        # scatter는 데이터 스냅샷마다 고정 → 직렬화 + gzip 압축본을 미리 만들어 둠
+        self.scatter_body = json_bytes(self._build_scatter())
+        self.scatter_body_gz = gzip.compress(self.scatter_body, compresslevel=9, mtime=0)
+
+    def derived_tables(self) -> dict:
+        """스냅샷에 함께 저장할 사전 직렬화 응답"""
+        return {"derived": {
+            "code_version": [CODE_VERSION],
+            "payload_tails": [bytes(t) for t in self.payload_tails],
+            "scatter": [self.scatter_body, self.scatter_body_gz],
+        }}
+
+    @classmethod
+    def load(cls, data_dir: str) -> "Dataset":
+        """snapshot.bin(mmap, 파싱 없음)이 최신이면 사용, 아니면 CSV (snapshot.py)"""
+        t = time.perf_counter()
+        data = load_data(data_dir)
+        return cls(data, load_ms=round((time.perf_counter() - t) * 1000, 1))
+
+    def district_body(self, pos: int, address: str) -> bytes:
+        """사전 직렬화된 상권 payload에 address만 끼워 넣은 응답 본문"""
+        return b'{"address":' + json_bytes(address) + b',' + self.payload_tails[pos]
+
+    def neighbors(self, x: float, y: float, k: int, radius: float | None = None,
+                  quadrants: list | None = None, min_rank: int | None = None,
+                  max_rank: int | None = None) -> tuple:
+        """TM 좌표 (x, y) 주변 상권 → (pos 배열, 거리(m) 배열), 가까운 순 최대 k개
+
+        radius 지정 시 반경 내 후보(query_ball_point), 아니면 k-NN 1회 조회.
+        필터가 있으면 통과 비율만큼 후보를 넉넉히 뽑아 거르고, 부족할 때만 전체로 재조회
+        """
+        leaf_ok = self.leaf_to_pos >= 0
+        pos_all = self.leaf_to_pos.clip(0)
+        if quadrants is not None:
+            leaf_ok &= np.isin(self.quadrant_id[pos_all], [QUADRANTS.index(q) for q in quadrants])
+        if min_rank is not None:
+            leaf_ok &= self.rank[pos_all] >= min_rank
+        if max_rank is not None:
+            leaf_ok &= self.rank[pos_all] <= max_rank
+        n_ok = int(leaf_ok.sum())
+        if not n_ok:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        if radius is not None:
+            leaves = np.asarray(self.tree.query_ball_point([x, y], r=radius), dtype=np.int64)
+            leaves = leaves[leaf_ok[leaves]]
+            coords = self.tree.data[leaves]
+            dist = np.hypot(coords[:, 0] - x, coords[:, 1] - y)
+            order = np.argsort(dist, kind='stable')[:k]
+            return self.leaf_to_pos[leaves[order]], dist[order]
+
+        k = min(k, n_ok)
+        fetch = k if n_ok == self.total_ranked else min(self.total_ranked, 2 * k * self.total_ranked // n_ok)
+        while True:
+            dist, leaves = self.tree.query([x, y], k=max(fetch, 1))
+            dist, leaves = np.atleast_1d(dist), np.atleast_1d(leaves)
+            keep = leaf_ok[leaves]
+            if keep.sum() >= k or fetch == self.total_ranked:
+                break
+            fetch = self.total_ranked
+        return self.leaf_to_pos[leaves[keep][:k]], dist[keep][:k]
+
+    def shops_within(self, x: float, y: float, radius: float, limit: int) -> list:
+        """TM 좌표 (x, y) 반경 radius(m) 내 찻집 — 가까운 순 최대 limit개"""
+        if self.shop_tree is None:
+            return []
+        idx = np.asarray(self.shop_tree.query_ball_point([x, y], r=radius), dtype=np.int64)
+        dist = np.hypot(self.shops["x"][idx] - x, self.shops["y"][idx] - y)
+        order = np.argsort(dist, kind='stable')[:limit]
+        s = self.shops
+        return [
+            {"name": s["가게명"][i], "category": s["카테고리"][i], "address": s["도로명주소"][i],
+             "district_name": s["상권_코드_명"][i], "district_code": int(s["상권_코드"][i]) or None,
+             "distance_m": round(float(d), 1),
+             "lat": round(float(s["lat"][i]), 6), "lon": round(float(s["lon"][i]), 6)}
+            for i, d in zip(idx[order].tolist(), dist[order].tolist())
+        ]
+
+    def neighbor_rows(self, pos: np.ndarray, dist: np.ndarray) -> list:
+        """neighbors() 결과 → 간단한 행 목록 (전체 payload 대신 비교용 필드만)"""
+        r = self.ranking
+        return [
+            {"rank": int(self.rank[p]), "district_name": self.names[p], "district_code": int(r['상권_코드'][p]),
+             "quadrant": r['사분면'][p], "unified_score": round(float(r['unified_score'][p]), 4),
+             "distance_m": round(float(d), 1)}
+            for p, d in zip(pos.tolist(), dist.tolist())
+        ]
+
+    def compare_columns(self, pos: np.ndarray) -> dict:
+        """여러 상권 비교용 컬럼형 데이터 — 입력 순서대로 정렬된 배열 (컬럼마다 gather 1회)"""
+        r = self.ranking
+
+        def col(name, digits=None):
+            v = r[name][pos]
+            if digits is not None:
+                v = np.round(v, digits)
+            return [None if x != x else x for x in v.tolist()]  # NaN → null
+
+        return {
+            "district_code": r['상권_코드'][pos].tolist(),
+            "district_name": [self.names[p] for p in pos.tolist()],
+            "gu": [self.gu[p] for p in pos.tolist()],
+            "quadrant": [r['사분면'][p] for p in pos.tolist()],
+            "rank": self.rank[pos].tolist(),
+            "unified_score": col('unified_score', 4),
+            "residual": col('residual_latest', 4),
+            "residual_avg": col('residual_avg', 4),
+            "supply_score": col('q1_supply_score', 4),
+            "tea_shop_count": col('찻집수_latest'),
+            "cafe_store_count": col('카페음료_점포수', 1),
+            "sales_total": col('매출_latest'),
+            "demand_pct": {subject: col(f'{prefix}_pct', 1) for subject, prefix in DEMAND_FACTORS},
+            "demand_raw": {subject: col(f'{prefix}_raw', 4) for subject, prefix in DEMAND_FACTORS},
+        }
+
+    def quarter_columns(self, qi: int, pos: np.ndarray) -> dict:
+        """분기 qi 기준 순위·점수 컬럼 (compare_columns의 같은 이름 필드를 덮어씀, 데이터 없으면 null)"""
+        h = self.history
+        present = h["rank"][qi][pos] > 0
+
+        def col(name):
+            v = np.round(h[name][qi][pos], 4)
+            return [x if ok else None for x, ok in zip(v.tolist(), present.tolist())]
+
+        return {
+            "quadrant": [self.quarter_quadrant(qi, p) for p in pos.tolist()],
+            "rank": [r if ok else None for r, ok in zip(h["rank"][qi][pos].tolist(), present.tolist())],
+            "unified_score": col("score"),
+            "residual_score": col("residual_pct"),
+            "supply_score": col("supply"),
+        }
+
+    def quarter_quadrant(self, qi: int, pos: int) -> str:
+        q = int(self.history["quadrant"][qi][pos])
+        return self.quadrant_labels[q] if q >= 0 else '일반 상권'
+
+    def quarter_pos_by_rank(self, qi: int, n: int) -> int | None:
+        """분기 qi의 n위 상권 위치 (동점이면 원래 행 순서상 첫 상권, 없으면 None)"""
+        order = self.quarter_order[qi]
+        ranks = self.history["rank"][qi][order]
+        i = int(np.searchsorted(ranks, n))
+        return int(order[i]) if i < len(order) and ranks[i] == n else None
+
+    def quarter_result(self, qi: int, pos: int, address: str) -> dict:
+        """상권 응답에서 순위·사분면만 분기 qi 값으로 바꾼 딕셔너리 (나머지 지표는 최신 값)"""
+        body = json.loads(self.district_body(pos, address))
+        rank = int(self.history["rank"][qi][pos])
+        quadrant = self.quarter_quadrant(qi, pos)
+        body.update({
+            "ranking": rank or None,
+            "total_ranked": self.quarter_total[qi],
+            "quadrant": quadrant,
+            "is_blue_ocean": quadrant == 'Q1_검증시장공백',
+            "as_of": self.quarters[qi],
+        })
+        return body
+
+    def make_result(self, res, target_name: str, address: str = "") -> dict:
+        """rows 행(dict) → /search 응답 딕셔너리 생성"""
+        cafe_store_count = float(res.get('카페음료_점포수', 1)) or 1
+        sales_total = float(res['매출_latest']) / 3
+        sales_per_store = float(res.get('cafe_revenue_per_store', res['매출_latest'] / cafe_store_count)) / 3
+
+        quadrant = str(res['사분면'])
+        urank = res.get('unified_rank')
+        urank = int(urank) if urank is not None and urank == urank else None  # NaN → None
+
+        subway_str = _format_subway(res.get('지하철_역_목록', ''))
+        if not subway_str:
+            n_lines = _si(res.get('지하철_노선_수_raw', res.get('지하철_노선_수', 0)))
+            subway_str = f'{n_lines}개 노선 (1.5km 내)' if n_lines > 0 else '인근 지하철 없음 (1.5km 내)'
+
+        cafe_pct = _sf(res.get('카페_검색지수_pct', 50), 50.0)
+        search_upper = max(1, round(100 - cafe_pct))
+
+        tea_names = list(self.tea_names_by_code.get(int(res['상권_코드']), ()))
+
+        return {
+            "address": address or target_name,
+            "district_name": target_name,
+            "ranking": urank,
+            "total_ranked": self.total_ranked,
+            "quadrant": quadrant,
+            "sales_total": sales_total,
+            "sales_per_store": sales_per_store,
+            "sales_prediction": sales_total,
+            "cafe_store_count": int(cafe_store_count),
+            "tea_shop_count": int(res['찻집수_latest']),
+            "tea_shop_names": tea_names,
+            "supply_shortage": round(float(res.get('supply_shortage', 0)) * 100, 1),
+            "is_blue_ocean": quadrant == 'Q1_검증시장공백',
+            "demand_factors": [
+                {"subject": "집객시설", "value": round(_sf(res.get('집객시설_수_pct', 50), 50), 1),
+                 "detail": f"{_si(res.get('집객시설_수_raw', 0)):,}개"},
+                {"subject": "직장인구", "value": round(_sf(res.get('총_직장_인구_수_pct', 50), 50), 1),
+                 "detail": f"{_si(res.get('총_직장_인구_수_raw', 0)):,}명"},
+                {"subject": "소득금액", "value": round(_sf(res.get('월_평균_소득_금액_pct', 50), 50), 1),
+                 "detail": f"월 {_si(res.get('월_평균_소득_금액_raw', 0)) // 10000:,}만원"},
+                {"subject": "가구수",   "value": round(_sf(res.get('총_가구_수_pct', 50), 50), 1),
+                 "detail": f"{_si(res.get('총_가구_수_raw', 0)):,}가구"},
+                {"subject": "검색지수", "value": round(cafe_pct, 1),
+                 "detail": f"서울 내 상위 {search_upper}%"},
+                {"subject": "지하철",   "value": round(_sf(res.get('지하철_노선_수_pct', 50), 50), 1),
+                 "detail": subway_str},
+            ],
+        }
+
+    def unranked_result(self, address: str, target_name: str) -> dict:
+        """랭킹 데이터가 없는 상권용 기본 응답"""
+        default_demand = [
+            {"subject": "집객시설", "value": 50},
+            {"subject": "직장인구", "value": 50},
+            {"subject": "소득금액", "value": 50},
+            {"subject": "가구수",   "value": 50},
+            {"subject": "검색지수", "value": 50},
+            {"subject": "지하철",   "value": 50},
+        ]
+        return {
+            "address": address,
+            "district_name": target_name,
+            "ranking": None,
+            "total_ranked": self.total_ranked,
+            "quadrant": None,
+            "sales_prediction": None,
+            "tea_shop_count": 0,
+            "is_blue_ocean": False,
+            "demand_factors": default_demand,
+        }
+
+    def _build_scatter(self) -> dict:
+        """2D 매트릭스 scatter payload — 컬럼형(병렬 배열)으로 1회 생성"""
+        out = {"names": [], "x": [], "y": [], "quadrant": [], "rank": [],
+               "threshold_x": 0.999, "threshold_y": 0.0}
+        if not self.n_ranking:
+            return out
+        r = self.ranking
+        keep = ~(np.isnan(r['supply_shortage']) | np.isnan(r['residual_latest']))
+        idx = np.flatnonzero(keep)
+
+        # supply_shortage는 대부분 1.0에 몰려있어서 시각적 jitter 추가 (seed 고정)
+        rng = np.random.default_rng(42)
+        x = r['supply_shortage'][idx] + rng.uniform(-0.025, 0.025, len(idx))
+
+        out["names"] = [r['상권_코드_명'][i] for i in idx]
+        out["x"] = np.round(x, 4).tolist()
+        out["y"] = np.round(r['residual_latest'][idx], 3).tolist()
+        out["quadrant"] = [r['사분면'][i] for i in idx]
+        out["rank"] = r['unified_rank'][idx].astype(int).tolist()
+        return out
+
+
+def build_snapshot(data_dir: str, path: str) -> int:
+    """CSV → 컬럼 데이터 + 사전 직렬화 응답을 스냅샷 파일로 저장. 쓴 바이트 수 반환"""
+    data = load_csv(data_dir)
+    return write_snapshot(path, {**data, **Dataset(data).derived_tables()})
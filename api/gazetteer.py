@@ -0,0 +1,180 @@
+# gazetteer.py
+# 오프라인 지명 사전 — 상권명·역명·행정동·자치구를 카카오 호출 없이 TM 좌표로 변환
+#
+# 검색어 대부분은 "망원동", "안암역", "홍대입구역 9번" 같은 지명 → 로컬 dict 조회(~1µs)로 처리하고
+# 도로명/지번 같은 전체 주소만 카카오로 보냄 (지연 감소 + 카카오 장애·쿼터 초과 시에도 검색 유지)
+#
+# 자동완성(/suggest): 이름(및 단어 시작 위치)을 초성 문자열 기준으로 정렬한 배열 1개 → bisect 범위 탐색
+#   "홍대" / "ㅎㄷ" / "홍ㄷ" / "홍대이"(입력 중인 마지막 글자) 모두 같은 인덱스로 처리
+#
+# places 테이블 (snapshot.py load_csv에서 생성, 스냅샷에 함께 저장):
+#   name / kind / gu : 표시용 이름, 종류(상권·역·행정동·자치구), 자치구
+#   x / y            : TM 좌표 (EPSG:5181) — 행정동·자치구는 소속 상권 좌표 평균
+
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+from geocache import normalize_address
+
+KINDS = ('상권', '역', '행정동', '자치구')  # 같은 키가 겹치면 앞 종류 우선 (더 구체적인 장소)
+
+_SEOUL = re.compile(r'^서울\s+')
+_NOISE = re.compile(r'[\s.·,()]')
+_DONG_NUMBER = re.compile(r'^(\D+?)[\d.·,]+동$')  # 망원1동 → 망원, 종로1.2.3.4가동 제외 (가동)
+_TOKEN_START = re.compile(r'(?:^|[\s(])([^\s()\d])')  # 단어 시작 위치 (숫자로 시작하는 "1번" 등 제외)
+
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSEONG_SET = frozenset(_CHOSEONG)
+SUGGEST_SCAN = 1000  # 초성 1~2글자처럼 후보가 많을 때 검사할 최대 항목 수
+
+
+def place_key(text: str) -> str:
+    """지명 비교용 키: 서울 접두어·공백·구두점 제거 ("서울 마포구 망원1동" → "마포구망원1동")"""
+    return _NOISE.sub('', _SEOUL.sub('', normalize_address(text))).lower()
+
+
+def suggest_key(text: str) -> str:
+    """자동완성 비교용 키: 공백·구두점 제거 (서울 접두어는 유지 — "서울대" → 서울대입구역)"""
+    return _NOISE.sub('', text).lower()
+
+
+def _is_syllable(ch: str) -> bool:
+    return '가' <= ch <= '힣'
+
+
+def chosung(text: str) -> str:
+    """한글 음절 → 초성 (그 외 문자는 그대로): 홍대입구 → ㅎㄷㅇㄱ"""
+    return ''.join(_CHOSEONG[(ord(c) - 0xAC00) // 588] if _is_syllable(c) else c for c in text)
+
+
+def _char_match(q: str, c: str, last: bool) -> bool:
+    """검색어 글자 q가 이름 글자 c와 맞는지 — 초성만 입력, 입력 중인 마지막 음절(받침 전) 허용"""
+    if q == c:
+        return True
+    if q in _CHOSEONG_SET:
+        return _is_syllable(c) and _CHOSEONG[(ord(c) - 0xAC00) // 588] == q
+    if last and _is_syllable(q) and _is_syllable(c) and (ord(q) - 0xAC00) % 28 == 0:
+        return (ord(q) - 0xAC00) // 28 == (ord(c) - 0xAC00) // 28  # 같은 초성+중성 (이 → 입)
+    return False
+
+
+def build_places(df_map, df_stations, transformer) -> dict:
+    """to_map.csv 전체 상권 + station_coords.csv → places 테이블 (CSV 로드 시 1회)
+
+    행정동은 번호를 뗀 이름(망원1동·망원2동 → 망원동)도 별칭으로 추가 — 사용자는 법정동명으로 많이 검색
+    """
+    names, kinds, gus, xs, ys = [], [], [], [], []
+
+    def add(name, kind, gu, x, y):
+        names.append(str(name))
+        kinds.append(kind)
+        gus.append(gu)
+        xs.append(float(x))
+        ys.append(float(y))
+
+    for row in df_map[['상권_코드_명', '자치구_코드_명', '엑스좌표_값', '와이좌표_값']].itertuples(index=False):
+        add(row[0], '상권', row[1], row[2], row[3])
+
+    lon, lat = df_stations['역_lon'].to_numpy(), df_stations['역_lat'].to_numpy()
+    st_x, st_y = transformer.transform(lon, lat)
+    for name, x, y in zip(df_stations['역명'], st_x, st_y):
+        add(name, '역', None, x, y)
+
+    coords = ['엑스좌표_값', '와이좌표_값']
+    dongs = df_map.groupby(['자치구_코드_명', '행정동_코드_명'], sort=True)[coords].mean()
+    for (gu, dong), (x, y) in dongs.iterrows():
+        add(dong, '행정동', gu, x, y)
+
+    base = df_map['행정동_코드_명'].str.replace(_DONG_NUMBER, r'\1동', regex=True)
+    alias = df_map[base != df_map['행정동_코드_명']].assign(기본동=base)
+    for (gu, dong), (x, y) in alias.groupby(['자치구_코드_명', '기본동'], sort=True)[coords].mean().iterrows():
+        if (gu, dong) not in dongs.index:
+            add(dong, '행정동', gu, x, y)
+
+    for gu, (x, y) in df_map.groupby('자치구_코드_명', sort=True)[coords].mean().iterrows():
+        add(gu, '자치구', gu, x, y)
+
+    return {"name": names, "kind": kinds, "gu": gus,
+            "x": np.array(xs, dtype=np.float64), "y": np.array(ys, dtype=np.float64)}
+
+
+class Gazetteer:
+    """places 테이블 → 정규화 키 dict (정확히 일치하는 지명만 처리, 나머지는 None → 카카오)"""
+
+    def __init__(self, places: dict):
+        self.names = places.get("name", [])
+        self.kinds = places.get("kind", [])
+        self.gus = places.get("gu", [])
+        self.x = places.get("x", np.empty(0))
+        self.y = places.get("y", np.empty(0))
+
+        # 키 → place 인덱스. 같은 종류 안에서 서로 다른 장소가 한 키를 공유하면
+        # (예: 중앙동 — 여러 자치구에 존재) 모호하므로 제외 → "구 + 동"으로만 조회됨
+        priority = {k: i for i, k in enumerate(KINDS)}
+        index, ambiguous = {}, set()
+        for i, (name, kind, gu) in enumerate(zip(self.names, self.kinds, self.gus)):
+            keys = [place_key(name)]
+            if kind == '행정동':
+                keys.append(place_key(f"{gu}{name}"))
+            for key in keys:
+                j = index.get(key)
+                if j is None:
+                    index[key] = i
+                elif self.kinds[j] == kind and (self.x[j], self.y[j]) != (self.x[i], self.y[i]):
+                    ambiguous.add((key, kind))
+                elif priority[kind] < priority[self.kinds[j]]:
+                    index[key] = i
+        for key, kind in ambiguous:
+            if key in index and self.kinds[index[key]] == kind:
+                del index[key]
+        self.index = index
+
+        # 자동완성 인덱스 — (초성 키, 키, place, 단어 시작 여부)를 초성 키 순으로 정렬
+        entries = []
+        for i, name in enumerate(self.names):
+            for m in _TOKEN_START.finditer(name):
+                key = suggest_key(name[m.start(1):])
+                entries.append((chosung(key), key, i, m.start(1) > 0))
+        entries.sort()
+        self._cho_keys = [e[0] for e in entries]
+        self._entries = entries
+        self._kind_order = [priority[k] for k in self.kinds]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, query: str) -> int | None:
+        """검색어 → place 인덱스 (없으면 None)"""
+        return self.index.get(place_key(query))
+
+    def xy(self, i: int) -> tuple:
+        return float(self.x[i]), float(self.y[i])
+
+    def suggest(self, query: str, limit: int = 10) -> list:
+        """입력 중인 검색어 → place 인덱스 목록 (이름 전체 접두어 일치 우선, 짧은 이름 우선)"""
+        q = suggest_key(query)
+        if not q:
+            return []
+        cq = chosung(q)
+        last = len(q) - 1
+        check = q != cq  # 초성만 입력했으면 초성 접두어 일치로 충분 — 글자별 비교 생략
+        matches = []
+        j = bisect_left(self._cho_keys, cq)
+        for cho_key, key, i, inner in self._entries[j:j + SUGGEST_SCAN]:
+            if not cho_key.startswith(cq):
+                break
+            if check and not all(_char_match(qc, kc, n == last) for n, (qc, kc) in enumerate(zip(q, key))):
+                continue
+            matches.append((inner, len(self.names[i]), self._kind_order[i], self.names[i], i))
+        matches.sort()
+        out, seen = [], set()
+        for *_, name, i in matches:
+            if (name, self.kinds[i]) in seen:
+                continue
+            seen.add((name, self.kinds[i]))
+            out.append(i)
+            if len(out) == limit:
+                break
+        return out
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 주소 정규화 규칙 — 같은 장소를 가리키는 표기 차이를 하나의 캐시 키로 통일
+_SEOUL_PREFIX = re.compile(r'^서울(?:특별시|시)?(?=\s|$)')
+_BUNJI = re.compile(r'(\d+)\s*번지')
+_DASH = re.compile(r'(\d+)\s*-\s*(\d+)')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_address(address: str) -> str:
+    """캐시 키용 주소 정규화: 공백 정리, 서울특별시/서울시 → 서울, '12 - 3번지' → '12-3'"""
+    s = _SPACES.sub(' ', str(address)).strip()
+    s = _SEOUL_PREFIX.sub('서울', s)
+    s = _BUNJI.sub(r'\1', s)
+    s = _DASH.sub(r'\1-\2', s)
+    return s
+
+
+class GeocodeCache:
+    """주소 → (lat, lon) 2단 캐시: 프로세스 내 LRU + SQLite 디스크 캐시
+
+    - 값이 None인 항목은 '카카오가 결과 없음으로 응답한 주소' (negative cache, 짧은 TTL)
+    - 디스크 캐시를 열 수 없으면(읽기 전용 FS 등) 메모리 LRU만 사용
+    - async 경로(aget/aset)는 SQLite 조회·commit을 스레드에서 실행 → 이벤트 루프를 막지 않음
+      (메모리 LRU와 디스크는 lock을 따로 씀: 디스크 fsync 중에도 메모리 조회는 바로 처리)
+    """
+
+    def __init__(self, path: str | None, maxsize: int = 4096,
+                 ttl: float = 30 * 86400, negative_ttl: float = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lru = OrderedDict()  # key → (value, expires_at)
+        self._lock = threading.Lock()     # 메모리 LRU
+        self._db_lock = threading.Lock()  # SQLite 연결 (스레드 간 공유)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 commit마다 fsync 불필요 (캐시라 유실 허용)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS geocode ("
+                    " key TEXT PRIMARY KEY, lat REAL, lon REAL, expires_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Geocode disk cache disabled: {e}")
+                self._db = None
+
+    def get(self, key: str):
+        """(hit 여부, 좌표 or None) 반환 — 메모리 → 디스크 순으로 조회"""
+        hit, value = self._get_memory(key)
+        if not hit:
+            hit, value = self._get_disk(key)
+        return hit, value
+
+    async def aget(self, key: str):
+        """get의 async 버전 — 디스크 조회만 스레드에서 실행"""
+        hit, value = self._get_memory(key)
+        if not hit and self._db is not None:
+            hit, value = await asyncio.to_thread(self._get_disk, key)
+        return hit, value
+
+    def set(self, key: str, value) -> None:
+        """카카오 응답 저장 (value: (lat, lon) 또는 결과 없음 None)"""
+        expires_at = self._set_memory(key, value)
+        self._set_disk(key, value, expires_at)
+
+    def aset(self, key: str, value) -> None:
+        """set의 async 경로 — 메모리는 즉시 반영, 디스크 쓰기는 스레드에서 (완료를 기다리지 않음)"""
+        expires_at = self._set_memory(key, value)
+        if self._db is not None:
+            asyncio.get_running_loop().run_in_executor(None, self._set_disk, key, value, expires_at)
+
+    def _get_memory(self, key: str):
+        now = time.time()
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None and item[1] > now:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return True, item[0]
+            if item is not None:
+                del self._lru[key]
+            if self._db is None:
+                self.misses += 1
+            return False, None
+
+    def _get_disk(self, key: str):
+        if self._db is None:
+            return False, None
+        now = time.time()
+        with self._db_lock:
+            try:
+                row = self._db.execute(
+                    "SELECT lat, lon, expires_at FROM geocode WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+        with self._lock:
+            if row is not None and row[2] > now:
+                value = None if row[0] is None else (row[0], row[1])
+                self._remember(key, value, row[2])
+                self.disk_hits += 1
+                return True, value
+            self.misses += 1
+            return False, None
+
+    def _set_memory(self, key: str, value) -> float:
+        expires_at = time.time() + (self.ttl if value is not None else self.negative_ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+        return expires_at
+
+    def _set_disk(self, key: str, value, expires_at: float) -> None:
+        if self._db is None:
+            return
+        lat, lon = value if value is not None else (None, None)
+        with self._db_lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode (key, lat, lon, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, lat, lon, expires_at),
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Geocode disk cache write failed: {e}")
+
+    def _remember(self, key, value, expires_at) -> None:
+        self._lru[key] = (value, expires_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self._lru),
+            "disk_enabled": self._db is not None,
+        }
+
+
+def cache_from_env(data_dir: str) -> GeocodeCache:
+    """환경변수로 캐시 설정 (Render: GEOCODE_CACHE_PATH를 persistent disk 경로로 지정)"""
+    path = os.environ.get("GEOCODE_CACHE_PATH", os.path.join(data_dir, "geocode_cache.sqlite3"))
+    return GeocodeCache(
+        path or None,
+        maxsize=int(os.environ.get("GEOCODE_CACHE_SIZE", 4096)),
+        ttl=float(os.environ.get("GEOCODE_CACHE_TTL", 30 * 86400)),
+        negative_ttl=float(os.environ.get("GEOCODE_NEGATIVE_TTL", 86400)),
+    )
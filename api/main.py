@@ -1,47 +1,40 @@
-import pandas as pd
+import time
+_T_START = time.perf_counter()  # 콜드 스타트 측정 기준 (import 포함)
+
+import asyncio
+import hashlib
 import numpy as np
-import re
-from fastapi import FastAPI, HTTPException, Query
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field
 from pyproj import Transformer
-from scipy.spatial import cKDTree
-import requests
+import httpx
 import os
 from dotenv import load_dotenv
+from geocache import cache_from_env, normalize_address
+from metrics import MetricsMiddleware, Registry
+from dataset import QUADRANTS, Dataset, json_bytes
+from snapshot import data_version, source_signature
 load_dotenv()  # 로컬: api/.env 읽기 / Render: 환경변수로 대체됨
 
-_LINE_NAMES = r'(\d+호선|경의중앙선|신분당선|경춘선|수인분당선|공항철도|경강선|서해선)'
-
-def _format_subway(raw) -> str:
-    """지하철_역_목록 → '2호선 강남역, 9호선 신논현역' 형식으로 정리 (중복 제거)"""
-    if not raw or (isinstance(raw, float) and raw != raw):
-        return ''
-    tokens = re.findall(_LINE_NAMES + r'\s+(\S+역)', str(raw))
-    seen, result = set(), []
-    for line, station in tokens:
-        key = f"{line} {station}"
-        if key not in seen:
-            seen.add(key)
-            result.append(key)
-    return ', '.join(result)
-
-def _si(v, d=0):
-    """안전한 int 변환 (NaN/None → d)"""
-    try:
-        f = float(v)
-        return d if (f != f) else int(f)  # NaN check
-    except:
-        return d
+@asynccontextmanager
+async def lifespan(app):
+    watcher = None
+    if DATA_WATCH_INTERVAL > 0:
+        watcher = asyncio.create_task(_watch_data(DATA_WATCH_INTERVAL))
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if _kakao_client is not None:
+        await _kakao_client.aclose()
 
-def _sf(v, d=0.0):
-    """안전한 float 변환 (NaN/None → d)"""
-    try:
-        f = float(v)
-        return d if (f != f) else f
-    except:
-        return d
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+# 지연/에러 계측 — /metrics (Prometheus text format)
+_metrics = Registry()
+app.add_middleware(MetricsMiddleware, registry=_metrics)
 
 # CORS 설정
 app.add_middleware(
@@ -52,199 +45,737 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 데이터 로드
+# 데이터 로드 — 현재 Dataset 참조 1개만 전역으로 유지 (dataset.py)
+# 요청 핸들러는 시작 시 ds = _dataset 으로 한 번만 읽어 끝까지 같은 버전 사용
 DATA_DIR = os.path.dirname(__file__)
-try:
-    df_map = pd.read_csv(os.path.join(DATA_DIR, "to_map.csv"))
-    # 35_blueocean_ranking.csv 에서 복사된 파일 (1,038개 상권 전체 데이터)
-    df_ranking = pd.read_csv(os.path.join(DATA_DIR, "unified_ranking.csv"))
-    # 찻집 위치 데이터 (가게명 조회용)
-    df_teashops = pd.read_csv(os.path.join(DATA_DIR, "teashops.csv"))
-    
-    # NaN 처리
-    df_ranking['찻집수_latest'] = df_ranking['찻집수_latest'].fillna(0)
-    df_ranking['매출_latest'] = df_ranking['매출_latest'].fillna(0)
-    df_ranking['사분면'] = df_ranking['사분면'].fillna('일반 상권')
-    df_ranking['블루오션_랭킹'] = pd.to_numeric(df_ranking['블루오션_랭킹'], errors='coerce').fillna(9999)
-
-    # 블루오션_랭킹: unified_ranking.csv에 저장된 값 그대로 사용
-    # (35_blueocean_smoothing.py에서 통합 스코어 기준으로 산정됨)
-    df_ranking['unified_rank'] = df_ranking['블루오션_랭킹']
-
-    # _pct 컬럼은 unified_ranking.csv에 미리 저장됨 (precompute_pct.py로 생성)
-    # startup 시 rank 연산 불필요 → Render 콜드 스타트 타임아웃 방지
-
-except Exception as e:
-    print(f"Error loading data: {e}")
-    df_map = pd.DataFrame(columns=['상권_코드', '상권_코드_명', '엑스좌표_값', '와이좌표_값'])
-    df_ranking = pd.DataFrame()
-    df_teashops = pd.DataFrame(columns=['가게명', '상권_코드_명'])
-
-# KDTree 구성 — ranked 상권(unified_ranking.csv)만 사용해 항상 유효한 매핑 보장
-ranked_names = set(df_ranking['상권_코드_명']) if not df_ranking.empty else set()
-df_map_ranked = df_map[df_map['상권_코드_명'].isin(ranked_names)].reset_index(drop=True)
-TOTAL_RANKED = len(df_map_ranked)
-
-if not df_map_ranked.empty:
-    map_coords = df_map_ranked[['엑스좌표_값', '와이좌표_값']].values
-    tree = cKDTree(map_coords)
-else:
-    tree = None
+_dataset = Dataset.load(DATA_DIR)
 
 transformer = Transformer.from_crs("EPSG:4326", "EPSG:5181", always_xy=True)
 
-def get_coords_from_kakao(address: str):
-    """Kakao Geocoding API를 활용하여 주소 -> 좌표 변환"""
+SEARCH_BATCH_MAX = int(os.environ.get("SEARCH_BATCH_MAX", 200))
+NEARBY_MAX = int(os.environ.get("NEARBY_MAX", 100))
+NEARBY_MAX_RADIUS = float(os.environ.get("NEARBY_MAX_RADIUS", 5000))  # m
+# /locate 서비스 범위 — 최근접 상권 중심까지 이보다 멀면 서울 밖으로 보고 결과 없음 (m)
+# 서울 안 산지(북한산·관악산)도 상권 중심에서 3km 이내, 과천·인천·일산은 5km 이상
+LOCATE_MAX_DISTANCE = float(os.environ.get("LOCATE_MAX_DISTANCE", 3000))
+CACHE_CONTROL = f"public, max-age={int(os.environ.get('CACHE_MAX_AGE', 300))}"
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 비교 (목록/와일드카드/약한 비교 W/ 허용)"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    tags = [t.strip().removeprefix('W/') for t in header.split(',')]
+    return '*' in tags or etag in tags
+
+def _cached_response(request: Request, body: bytes, etag: str,
+                     cache_control: str = CACHE_CONTROL, headers: dict | None = None) -> Response:
+    """데이터·응답 코드 버전 기반 강한 ETag 응답 — 일치하면 본문 없이 304"""
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+# 지오코딩 캐시 — 메모리 LRU + SQLite (재시작/콜드 스타트 후에도 유지)
+geocode_cache = cache_from_env(DATA_DIR)
+
+# 카카오 API 공용 비동기 클라이언트 — keep-alive 커넥션 풀 재사용 + 동시 요청 수 제한
+KAKAO_URL = os.environ.get("KAKAO_API_URL", "https://dapi.kakao.com/v2/local/search/address.json")
+_kakao_client = None
+_kakao_slots = asyncio.Semaphore(int(os.environ.get("KAKAO_MAX_CONCURRENCY", 32)))
+
+def _get_kakao_client() -> httpx.AsyncClient:
+    global _kakao_client
+    if _kakao_client is None:
+        _kakao_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=int(os.environ.get("KAKAO_MAX_CONNECTIONS", 32)),
+                                max_keepalive_connections=16, keepalive_expiry=60),
+        )
+    return _kakao_client
+
+# single-flight: 같은 정규화 주소의 동시 요청은 진행 중인 카카오 호출 1건을 공유
+_kakao_inflight = {}  # 정규화 주소 → asyncio.Task
+geocode_coalesced = 0
+geocode_local = 0  # 오프라인 지명 사전(gazetteer.py)으로 처리한 검색 수
+
+async def get_coords_from_kakao(address: str):
+    """Kakao Geocoding API를 활용하여 주소 -> 좌표 변환 (캐시 우선)"""
+    global geocode_coalesced
     API_KEY = os.environ.get("KAKAO_API_KEY", "")
     if not API_KEY:
         return None
 
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    headers = {"Authorization": f"KakaoAK {API_KEY}"}
+    key = normalize_address(address)
+    hit, coords = await geocode_cache.aget(key)
+    if hit:
+        return coords
+
+    task = _kakao_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_kakao(key, API_KEY))
+        _kakao_inflight[key] = task
+        task.add_done_callback(lambda _: _kakao_inflight.pop(key, None))
+    else:
+        geocode_coalesced += 1
+    # shield: 먼저 온 요청의 클라이언트가 끊겨도 공유 호출은 취소되지 않음
+    return await asyncio.shield(task)
+
+async def _fetch_kakao(key: str, api_key: str):
+    """카카오 주소 검색 1회 호출 → 결과 캐시 저장"""
+    headers = {"Authorization": f"KakaoAK {api_key}"}
 
     try:
-        res = requests.get(url, headers=headers, params={"query": address}, timeout=5)
+        async with _kakao_slots:
+            with _metrics.span("kakao_upstream"):
+                res = await _get_kakao_client().get(KAKAO_URL, headers=headers, params={"query": key})
+        res.raise_for_status()
         data = res.json()
-        if data.get("documents"):
-            doc = data["documents"][0]
-            return float(doc["y"]), float(doc["x"])  # lat, lon
     except:
-        pass
-    return None
+        return None  # 네트워크/응답 오류는 캐시하지 않음
+
+    coords = None
+    if data.get("documents"):
+        doc = data["documents"][0]
+        coords = float(doc["y"]), float(doc["x"])  # lat, lon
+    geocode_cache.aset(key, coords)
+    return coords
+
+async def geocode_tm(ds: Dataset, address: str) -> tuple | None:
+    """주소 → TM 좌표. 지명(상권·역·행정동·자치구)은 로컬 사전, 전체 주소만 카카오 호출"""
+    global geocode_local
+    place = ds.gazetteer.lookup(address)
+    if place is not None:
+        geocode_local += 1
+        return ds.gazetteer.xy(place)
+    with _metrics.span("geocode"):
+        coords = await get_coords_from_kakao(address)
+    if coords is None:
+        return None
+    lat, lon = coords
+    with _metrics.span("transform"):
+        return transformer.transform(lon, lat)
+
+async def geocode_tm_many(ds: Dataset, addresses: list) -> list:
+    """geocode_tm 일괄 버전 — 카카오 호출은 동시에, 좌표 변환은 1회 벡터 연산"""
+    global geocode_local
+    out = [ds.gazetteer.lookup(a) for a in addresses]
+    remote = [i for i, place in enumerate(out) if place is None]
+    for i, place in enumerate(out):
+        if place is not None:
+            out[i] = ds.gazetteer.xy(place)
+    geocode_local += len(addresses) - len(remote)
+    with _metrics.span("batch_geocode"):
+        coords = await asyncio.gather(*(get_coords_from_kakao(addresses[i]) for i in remote))
+    found = [(i, c) for i, c in zip(remote, coords) if c is not None]
+    if found:
+        xs, ys = _transform_many([c for _, c in found])
+        for (i, _), x, y in zip(found, xs.tolist(), ys.tolist()):
+            out[i] = (x, y)
+    return out
+
+root_body = json_bytes({"status": "online", "message": "BlueOcean Finder API is running"})
 
 @app.get("/")
-def read_root():
-    return {"status": "online", "message": "BlueOcean Finder API is running"}
-
-def _make_result(res, target_name: str, address: str = "") -> dict:
-    """ranking_row Series → /search 응답 딕셔너리 생성"""
-    cafe_store_count = float(res.get('카페음료_점포수', 1)) or 1
-    sales_total = float(res['매출_latest']) / 3
-    sales_per_store = float(res.get('cafe_revenue_per_store', res['매출_latest'] / cafe_store_count)) / 3
-
-    quadrant = str(res['사분면'])
-    urank = int(res['unified_rank']) if not pd.isna(res.get('unified_rank')) else None
-
-    subway_str = _format_subway(res.get('지하철_역_목록', ''))
-    if not subway_str:
-        n_lines = _si(res.get('지하철_노선_수_raw', res.get('지하철_노선_수', 0)))
-        subway_str = f'{n_lines}개 노선 (1.5km 내)' if n_lines > 0 else '인근 지하철 없음 (1.5km 내)'
-
-    cafe_pct = _sf(res.get('카페_검색지수_pct', 50), 50.0)
-    search_upper = max(1, round(100 - cafe_pct))
-
-    tea_names = []
-    if not df_teashops.empty and '상권_코드_명' in df_teashops.columns:
-        matched = df_teashops[df_teashops['상권_코드_명'] == target_name]
-        tea_names = matched['가게명'].dropna().tolist()
-
+def read_root(request: Request):
+    # 헬스 체크 용도이므로 매번 재검증(no-cache) — 304로 본문 전송만 생략
+    return _cached_response(request, root_body, f'"{_dataset.version}-root"', cache_control="no-cache")
+
+@app.get("/stats")
+def get_stats():
+    """캐시 적중/미스 카운터 + 데이터 로드 정보"""
+    ds = _dataset
     return {
-        "address": address or target_name,
-        "district_name": target_name,
-        "ranking": urank,
-        "total_ranked": TOTAL_RANKED,
-        "quadrant": quadrant,
-        "sales_total": sales_total,
-        "sales_per_store": sales_per_store,
-        "sales_prediction": sales_total,
-        "cafe_store_count": int(cafe_store_count),
-        "tea_shop_count": int(res['찻집수_latest']),
-        "tea_shop_names": tea_names,
-        "supply_shortage": round(float(res.get('supply_shortage', 0)) * 100, 1),
-        "is_blue_ocean": quadrant == 'Q1_검증시장공백',
-        "demand_factors": [
-            {"subject": "집객시설", "value": round(_sf(res.get('집객시설_수_pct', 50), 50), 1),
-             "detail": f"{_si(res.get('집객시설_수_raw', 0)):,}개"},
-            {"subject": "직장인구", "value": round(_sf(res.get('총_직장_인구_수_pct', 50), 50), 1),
-             "detail": f"{_si(res.get('총_직장_인구_수_raw', 0)):,}명"},
-            {"subject": "소득금액", "value": round(_sf(res.get('월_평균_소득_금액_pct', 50), 50), 1),
-             "detail": f"월 {_si(res.get('월_평균_소득_금액_raw', 0)) // 10000:,}만원"},
-            {"subject": "가구수",   "value": round(_sf(res.get('총_가구_수_pct', 50), 50), 1),
-             "detail": f"{_si(res.get('총_가구_수_raw', 0)):,}가구"},
-            {"subject": "검색지수", "value": round(cafe_pct, 1),
-             "detail": f"서울 내 상위 {search_upper}%"},
-            {"subject": "지하철",   "value": round(_sf(res.get('지하철_노선_수_pct', 50), 50), 1),
-             "detail": subway_str},
-        ],
+        "geocode_cache": geocode_cache.stats(),
+        "geocode_coalesced": geocode_coalesced,
+        "geocode_local": geocode_local,
+        "data": {"source": ds.source, "version": ds.version,
+                 "load_ms": ds.load_ms, "startup_ms": STARTUP_MS, "reloads": data_reloads},
     }
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text format — 엔드포인트/단계별 지연 히스토그램(p50/p95/p99), 에러 수, 캐시 적중률"""
+    ds = _dataset
+    cache = geocode_cache.stats()
+    extra = [
+        ("aicha_geocode_cache_hits_total", "counter", "지오코딩 캐시 적중 (계층별)",
+         [('{tier="memory"}', cache["memory_hits"]), ('{tier="disk"}', cache["disk_hits"])]),
+        ("aicha_geocode_cache_misses_total", "counter", "지오코딩 캐시 미스", [("", cache["misses"])]),
+        ("aicha_geocode_cache_hit_ratio", "gauge", "지오코딩 캐시 적중률", [("", cache["hit_rate"])]),
+        ("aicha_geocode_coalesced_total", "counter", "single-flight로 합쳐진 지오코딩 요청",
+         [("", geocode_coalesced)]),
+        ("aicha_geocode_local_total", "counter", "오프라인 지명 사전으로 처리한 지오코딩 요청",
+         [("", geocode_local)]),
+        ("aicha_data_reloads_total", "counter", "데이터 핫 리로드 횟수", [("", data_reloads)]),
+        ("aicha_data_load_seconds", "gauge", "현재 데이터 로드 시간",
+         [(f'{{source="{ds.source}",version="{ds.version}"}}', ds.load_ms / 1000)]),
+        ("aicha_startup_seconds", "gauge", "프로세스 시작 ~ 서비스 준비 시간", [("", STARTUP_MS / 1000)]),
+    ]
+    return Response(_metrics.render(extra), media_type="text/plain; version=0.0.4")
+
+# ══════════════════════════════════════════════════════════════
+# 핫 리로드 — 새 Dataset을 스레드에서 완성한 뒤 _dataset 참조만 원자적으로 교체
+# ══════════════════════════════════════════════════════════════
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+DATA_WATCH_INTERVAL = float(os.environ.get("DATA_WATCH_INTERVAL", 30))  # 0: 감시 끔
+_reload_lock = asyncio.Lock()
+data_reloads = 0
+
+async def reload_dataset(force: bool = False) -> dict:
+    """데이터 버전이 바뀌었으면(force: 항상) 새 Dataset 로드 후 교체"""
+    global _dataset, data_reloads
+    async with _reload_lock:
+        old = _dataset
+        if not force and await asyncio.to_thread(data_version, DATA_DIR) == old.version:
+            return {"reloaded": False, "version": old.version}
+        with _metrics.span("dataset_load"):
+            new = await asyncio.to_thread(Dataset.load, DATA_DIR)
+        if not new.n_ranking:
+            # 로드 실패(빈 데이터) → 기존 데이터 유지
+            raise HTTPException(status_code=500, detail="Reload failed: data not loaded.")
+        _dataset = new
+        data_reloads += 1
+        print(f"Data reloaded from {new.source} in {new.load_ms} ms (version {old.version} → {new.version})")
+        return {"reloaded": True, "version": new.version, "previous": old.version,
+                "source": new.source, "load_ms": new.load_ms}
+
+async def _watch_data(interval: float):
+    """CSV/스냅샷 파일 변경 감시 — 파일 쓰기 도중 로드하지 않도록 한 주기 동안 변화가 없을 때 리로드"""
+    seen = source_signature(DATA_DIR)
+    pending = None
+    while True:
+        await asyncio.sleep(interval)
+        sig = source_signature(DATA_DIR)
+        if sig == seen:
+            pending = None
+            continue
+        if sig != pending:
+            pending = sig  # 변경 감지 — 다음 주기에 그대로면 리로드
+            continue
+        try:
+            await reload_dataset()
+        except Exception as e:
+            print(f"Error reloading data: {e}")
+        seen, pending = sig, None
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request, force: bool = False):
+    """데이터 수동 리로드 (ADMIN_TOKEN 설정 시에만 활성, X-Admin-Token 헤더 필요)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return await reload_dataset(force=force)
+
+def _district_response(request: Request, ds: Dataset, pos: int, address: str, qi: int | None = None) -> Response:
+    """사전 직렬화된 상권 payload에 요청 address만 끼워 넣어 응답 (qi: as_of 분기 — 순위·사분면만 교체)"""
+    tag = f"{pos}" if qi is None else f"{pos}-q{ds.quarters[qi]}"
+    etag = f'"{ds.etag_version}-{tag}-{hashlib.sha1(json_bytes(address)).hexdigest()[:12]}"'
+    if _etag_matches(request, etag):
+        return _cached_response(request, b'', etag)
+    body = ds.district_body(pos, address) if qi is None else json_bytes(ds.quarter_result(qi, pos, address))
+    return _cached_response(request, body, etag)
+
+AS_OF_DESCRIPTION = "기준 분기 (예: 20244) — 순위·사분면을 그 분기 값으로"
+
+def _quarter_index(ds: Dataset, as_of: int | None) -> int | None:
+    """as_of(기준_년분기_코드, 예: 20244) → 분기 행렬 인덱스 (None: 최신 서비스 순위)"""
+    if as_of is None:
+        return None
+    qi = ds.quarter_index.get(as_of)
+    if qi is None:
+        quarters = ', '.join(map(str, ds.quarters)) or '없음'
+        raise HTTPException(status_code=404, detail=f"as_of: 분기 데이터가 없습니다 ({as_of}). 가능한 분기: {quarters}")
+    return qi
+
 
 @app.get("/search")
-def search_district(address: str = Query(..., description="검색할 주소")):
-    if tree is None:
+async def search_district(request: Request, address: str = Query(..., description="검색할 주소"),
+                          as_of: int | None = Query(None, description=AS_OF_DESCRIPTION)):
+    ds = _dataset
+    if ds.tree is None:
         raise HTTPException(status_code=500, detail="Data not loaded.")
-    
-    coords = get_coords_from_kakao(address)
-    if coords is None:
-        raise HTTPException(status_code=400, detail="주소를 찾을 수 없습니다. 더 구체적인 주소(구·동 포함)를 입력해 주세요.")
-    lat, lon = coords
-    tm_x, tm_y = transformer.transform(lon, lat)
-    _, index = tree.query([tm_x, tm_y], k=1)
-    
-    target_name = df_map_ranked.iloc[index]['상권_코드_명']
-    ranking_row = df_ranking[df_ranking['상권_코드_명'] == target_name]
-    
-    default_demand = [
-        {"subject": "집객시설", "value": 50},
-        {"subject": "직장인구", "value": 50},
-        {"subject": "소득금액", "value": 50},
-        {"subject": "가구수",   "value": 50},
-        {"subject": "검색지수", "value": 50},
-        {"subject": "지하철",   "value": 50},
-    ]
+    qi = _quarter_index(ds, as_of)
 
-    if ranking_row.empty:
-        return {
-            "address": address,
-            "district_name": target_name,
-            "ranking": None,
-            "total_ranked": TOTAL_RANKED,
-            "quadrant": None,
-            "sales_prediction": None,
-            "tea_shop_count": 0,
-            "is_blue_ocean": False,
-            "demand_factors": default_demand,
-        }
+    tm = await geocode_tm(ds, address)
+    if tm is None:
+        raise HTTPException(status_code=400, detail="주소를 찾을 수 없습니다. 더 구체적인 주소(구·동 포함)를 입력해 주세요.")
+    with _metrics.span("kdtree"):
+        _, index = ds.tree.query(tm, k=1)
+    pos = ds.leaf_to_pos[index]
+    if pos < 0:
+        return ds.unranked_result(address, ds.leaf_names[index])
+
+    with _metrics.span("payload"):
+        return _district_response(request, ds, pos, address, qi)
+
+class BatchSearchRequest(BaseModel):
+    addresses: list[str] = Field(..., min_length=1, max_length=SEARCH_BATCH_MAX)
+
+@app.post("/search/batch")
+async def search_batch(body: BatchSearchRequest):
+    """여러 주소 일괄 검색 — 입력 순서대로 /search와 같은 형식의 결과 반환 (실패 항목은 error)
+
+    지명은 로컬 사전, 나머지는 캐시/single-flight를 거쳐 동시에 카카오 조회(동시 호출 수는 공용 세마포어로 제한)하고,
+    좌표 변환과 KDTree 탐색은 전체 주소에 대해 1회 벡터 연산으로 수행
+    """
+    ds = _dataset
+    if ds.tree is None:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
 
-    res = ranking_row.iloc[0]
-    return _make_result(res, target_name, address)
+    addresses = body.addresses
+    tm = await geocode_tm_many(ds, addresses)
+    found = [i for i, t in enumerate(tm) if t is not None]
+
+    _, leaves = _query_leaves(ds, [tm[i] for i in found])
+    parts = [None] * len(addresses)
+    for i, leaf in zip(found, leaves):
+        parts[i] = _leaf_body(ds, leaf, addresses[i])
+    for i, part in enumerate(parts):
+        if part is None:
+            parts[i] = json_bytes({"address": addresses[i], "error": "주소를 찾을 수 없습니다."})
+    return _batch_response(len(addresses), len(found), parts)
+
+def _transform_many(coords: list) -> tuple:
+    """(lat, lon) 목록 → TM x, y 배열 (1회 벡터 연산)"""
+    lats, lons = np.array(coords, dtype=np.float64).reshape(-1, 2).T
+    with _metrics.span("batch_transform"):
+        return transformer.transform(lons, lats)
+
+def _query_leaves(ds: Dataset, tm) -> tuple:
+    """TM 좌표 목록 또는 (n, 2) 배열 → (최근접 거리 배열 m, KDTree leaf 배열) (1회 벡터 연산)"""
+    if len(tm) == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+    with _metrics.span("batch_kdtree"):
+        return ds.tree.query(np.asarray(tm, dtype=np.float64), k=1)
+
+def _leaf_body(ds: Dataset, leaf: int, address: str | None) -> bytes:
+    """leaf → 응답 본문 (address 없으면 상권명)"""
+    pos = ds.leaf_to_pos[leaf]
+    if pos < 0:
+        name = ds.leaf_names[leaf]
+        return json_bytes(ds.unranked_result(address or name, name))
+    return ds.district_body(pos, address or ds.names[pos])
+
+def _batch_response(count: int, found: int, parts: list) -> Response:
+    head = json_bytes({"count": count, "found": found})[:-1]
+    return Response(head + b',"results":[' + b','.join(parts) + b']}', media_type="application/json")
+
+@app.get("/locate")
+async def locate_district(request: Request, lat: float = Query(..., ge=-90, le=90),
+                          lon: float = Query(..., ge=-180, le=180)):
+    """위경도(지도 클릭·GPS)로 최근접 상권 조회 — 카카오 지오코딩 없이 좌표 변환 + KDTree만 수행
+
+    응답 형식은 /search와 같고 address는 상권명. 최근접 상권이 LOCATE_MAX_DISTANCE보다 멀면(서울 밖) 404
+    """
+    ds = _dataset
+    if ds.tree is None:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    with _metrics.span("transform"):
+        tm_x, tm_y = transformer.transform(lon, lat)
+    with _metrics.span("kdtree"):
+        distance, index = ds.tree.query([tm_x, tm_y], k=1)
+    if distance > LOCATE_MAX_DISTANCE:
+        raise HTTPException(status_code=404, detail="서비스 지역(서울) 밖의 좌표입니다.")
+    pos = ds.leaf_to_pos[index]
+    if pos < 0:
+        name = ds.leaf_names[index]
+        return ds.unranked_result(name, name)
+    with _metrics.span("payload"):
+        return _district_response(request, ds, pos, ds.names[pos])
+
+class BatchLocateRequest(BaseModel):
+    points: list[tuple[float, float]] = Field(..., min_length=1, max_length=SEARCH_BATCH_MAX,
+                                              description="[lat, lon] 목록")
+
+@app.post("/locate/batch")
+async def locate_batch(body: BatchLocateRequest):
+    """여러 위경도 일괄 조회 — 입력 순서대로 /locate와 같은 형식의 결과 반환 (서비스 지역 밖 항목은 error)"""
+    ds = _dataset
+    if ds.tree is None:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    distances, leaves = _query_leaves(ds, np.column_stack(_transform_many(body.points)))
+    parts = []
+    for (lat, lon), distance, leaf in zip(body.points, distances, leaves):
+        if distance > LOCATE_MAX_DISTANCE:
+            parts.append(json_bytes({"lat": lat, "lon": lon, "error": "서비스 지역(서울) 밖의 좌표입니다."}))
+        else:
+            parts.append(_leaf_body(ds, leaf, None))
+    found = int((distances <= LOCATE_MAX_DISTANCE).sum())
+    return _batch_response(len(parts), found, parts)
+
+async def _resolve_tm(ds: Dataset, address: str | None, lat: float | None, lon: float | None) -> tuple:
+    """주소(지명 사전/카카오) 또는 위경도 → TM 좌표 (EPSG:5181)"""
+    if lat is None or lon is None:
+        if not address:
+            raise HTTPException(status_code=400, detail="address 또는 lat/lon을 입력해 주세요.")
+        tm = await geocode_tm(ds, address)
+        if tm is None:
+            raise HTTPException(status_code=400, detail="주소를 찾을 수 없습니다. 더 구체적인 주소(구·동 포함)를 입력해 주세요.")
+        return tm
+    with _metrics.span("transform"):
+        return transformer.transform(lon, lat)
+
+BBOX_LIMIT = int(os.environ.get("BBOX_LIMIT", 500))
+BBOX_LIMIT_MAX = 2000
+
+@app.get("/bbox")
+async def districts_in_bbox(
+    request: Request,
+    min_lat: float = Query(..., ge=-90, le=90), min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90), max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(BBOX_LIMIT, ge=1, le=BBOX_LIMIT_MAX, description="최대 상권 수 (초과 시 순위 높은 순)"),
+):
+    """지도 화면 영역(WGS84) 안의 상권 — 컬럼형 (이름·코드·위경도·순위·사분면·점수)
+
+    넓은 영역(낮은 줌)에서 limit을 넘으면 순위 높은 상권만 반환 (truncated: true)
+    """
+    ds = _dataset
+    if ds.tree is None:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="min_lat ≤ max_lat, min_lon ≤ max_lon 이어야 합니다.")
+
+    with _metrics.span("transform"):
+        # 네 모서리를 TM으로 1회 변환 → 외접 사각형으로 격자 후보 추출, 위경도로 정밀 필터
+        xs, ys = transformer.transform([min_lon, min_lon, max_lon, max_lon], [min_lat, max_lat, min_lat, max_lat])
+    with _metrics.span("bbox_query"):
+        leaves = ds.grid.query(min(xs), min(ys), max(xs), max(ys))
+        lat, lon = ds.leaf_lat[leaves], ds.leaf_lon[leaves]
+        leaves = leaves[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)]
+        leaves = leaves[ds.leaf_to_pos[leaves] >= 0]
+        total = len(leaves)
+        order = np.argsort(ds.rank[ds.leaf_to_pos[leaves]], kind='stable')[:limit]
+        leaves = leaves[order]
+        pos = ds.leaf_to_pos[leaves]
+
+    r = ds.ranking
+    body = json_bytes({
+        "total": total,
+        "count": len(pos),
+        "truncated": total > len(pos),
+        "names": [ds.names[p] for p in pos.tolist()],
+        "codes": r['상권_코드'][pos].tolist(),
+        "lat": np.round(ds.leaf_lat[leaves], 6).tolist(),
+        "lon": np.round(ds.leaf_lon[leaves], 6).tolist(),
+        "rank": ds.rank[pos].tolist(),
+        "quadrant": [r['사분면'][p] for p in pos.tolist()],
+        "score": np.round(r['unified_score'][pos], 4).tolist(),
+    })
+    return Response(body, media_type="application/json", headers={"Cache-Control": CACHE_CONTROL})
+
+SUGGEST_MAX = 20
+
+@app.get("/suggest")
+async def suggest_places(q: str = Query(..., min_length=1, max_length=50, description="입력 중인 검색어"),
+                         limit: int = Query(10, ge=1, le=SUGGEST_MAX)):
+    """검색어 자동완성 — 상권·역·행정동·자치구 이름 (초성 검색 지원, 예: ㅎㄷㅇㄱ → 홍대입구역)
+
+    메모리 인덱스 조회만 하는 짧은 작업이라 threadpool 전환 없이 이벤트 루프에서 처리
+    """
+    ds = _dataset
+    g = ds.gazetteer
+    rows = []
+    for i in g.suggest(q, limit):
+        pos = ds.pos_by_name.get(g.names[i]) if g.kinds[i] == '상권' else None
+        rows.append({"name": g.names[i], "kind": g.kinds[i], "gu": g.gus[i],
+                     "rank": None if pos is None else int(ds.rank[pos])})
+    return Response(json_bytes({"query": q, "suggestions": rows}), media_type="application/json",
+                    headers={"Cache-Control": CACHE_CONTROL})
+
+@app.get("/nearby")
+async def nearby_districts(
+    address: str | None = Query(None, description="기준 주소 (lat/lon이 없을 때)"),
+    lat: float | None = Query(None, ge=-90, le=90),
+    lon: float | None = Query(None, ge=-180, le=180),
+    k: int = Query(10, ge=1, le=NEARBY_MAX, description="최대 상권 수"),
+    radius: float | None = Query(None, gt=0, le=NEARBY_MAX_RADIUS, description="반경 (m)"),
+    quadrant: str | None = Query(None, description="사분면 필터 (예: Q1,Q2)"),
+    min_rank: int | None = Query(None, ge=1),
+    max_rank: int | None = Query(None, ge=1),
+):
+    """기준 위치 주변 상권 — 가까운 순 k개 (radius 지정 시 반경 내), 순위/사분면 필터"""
+    ds = _dataset
+    if ds.tree is None:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    quadrants = None
+    if quadrant:
+        quadrants = [q.strip().upper() for q in quadrant.split(',') if q.strip()]
+        if not set(quadrants) <= set(QUADRANTS):
+            raise HTTPException(status_code=400, detail=f"quadrant는 {','.join(QUADRANTS)} 중에서 선택해 주세요.")
+
+    tm_x, tm_y = await _resolve_tm(ds, address, lat, lon)
+    with _metrics.span("kdtree"):
+        pos, dist = ds.neighbors(tm_x, tm_y, k, radius, quadrants, min_rank, max_rank)
+    rows = ds.neighbor_rows(pos, dist)
+    return Response(json_bytes({"count": len(rows), "k": k, "radius": radius, "results": rows}),
+                    media_type="application/json")
+
+TEASHOP_MAX_RADIUS = 3000.0  # m
+
+@app.get("/teashops/nearby")
+async def nearby_teashops(
+    address: str | None = Query(None, description="기준 주소 (lat/lon이 없을 때)"),
+    lat: float | None = Query(None, ge=-90, le=90),
+    lon: float | None = Query(None, ge=-180, le=180),
+    radius: float = Query(500, gt=0, le=TEASHOP_MAX_RADIUS, description="반경 (m)"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """기준 위치 반경 내 찻집 (경쟁 점포 확인용) — 가까운 순"""
+    ds = _dataset
+    tm_x, tm_y = await _resolve_tm(ds, address, lat, lon)
+    with _metrics.span("teashop_query"):
+        rows = ds.shops_within(tm_x, tm_y, radius, limit)
+    return Response(json_bytes({"count": len(rows), "radius": radius, "results": rows}),
+                    media_type="application/json")
 
 @app.get("/rank/{n}")
-def search_by_rank(n: int):
-    """순위 번호(1~TOTAL_RANKED)로 상권 조회"""
-    if df_ranking.empty:
+def search_by_rank(request: Request, n: int, as_of: int | None = Query(None, description=AS_OF_DESCRIPTION)):
+    """순위 번호(1~TOTAL_RANKED)로 상권 조회 — as_of 지정 시 그 분기 순위 기준"""
+    ds = _dataset
+    if not ds.n_ranking:
         raise HTTPException(status_code=500, detail="Data not loaded.")
-    if n < 1 or n > TOTAL_RANKED:
-        raise HTTPException(status_code=404, detail=f"순위는 1~{TOTAL_RANKED} 범위로 입력해 주세요.")
-    row = df_ranking[df_ranking['unified_rank'] == n]
-    if row.empty:
+    qi = _quarter_index(ds, as_of)
+    total = ds.total_ranked if qi is None else ds.quarter_total[qi]
+    if n < 1 or n > total:
+        raise HTTPException(status_code=404, detail=f"순위는 1~{total} 범위로 입력해 주세요.")
+    pos = ds.pos_by_rank.get(n) if qi is None else ds.quarter_pos_by_rank(qi, n)
+    if pos is None:
         raise HTTPException(status_code=404, detail=f"{n}번 순위 상권을 찾을 수 없습니다.")
-    res = row.iloc[0]
-    target_name = str(res['상권_코드_명'])
-    return _make_result(res, target_name)
-
+    return _district_response(request, ds, pos, ds.names[pos], qi)
+
+
+RANKING_PAGE_MAX = 100
+
+def _split_values(value: str | None) -> list:
+    return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+def _parse_thresholds(ds: Dataset, specs: list, param: str) -> dict:
+    """'컬럼:값' 목록 → {컬럼: float}"""
+    out = {}
+    for spec in specs:
+        col, _, value = spec.rpartition(':')
+        if col not in ds.listing.numeric:
+            raise HTTPException(status_code=400, detail=f"{param}: 알 수 없는 컬럼입니다 ({col or spec}).")
+        try:
+            out[col] = float(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"{param}: 숫자가 아닙니다 ({spec}).")
+    return out
+
+QUARTER_SORTS = {"unified_rank": "asc", "unified_score": "desc"}  # as_of 지정 시 분기 순위로 정렬하는 컬럼 (기본 방향)
+
+@app.get("/ranking")
+def list_ranking(
+    request: Request,
+    gu: str | None = Query(None, description="자치구 (쉼표로 여러 개)"),
+    district_type: str | None = Query(None, alias="type", description="상권유형 (쉼표로 여러 개)"),
+    quadrant: str | None = Query(None, description="사분면 (예: Q1,Q2)"),
+    minimum: list[str] = Query([], alias="min", description="하한 '컬럼:값' (예: unified_score:0.7)"),
+    maximum: list[str] = Query([], alias="max", description="상한 '컬럼:값' (예: 찻집수_latest:0)"),
+    sort: str = Query("unified_rank", description="정렬 컬럼"),
+    order: str | None = Query(None, pattern="^(asc|desc)$", description="기본: 순위는 asc, 그 외 desc"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=RANKING_PAGE_MAX),
+    as_of: int | None = Query(None, description="기준 분기 (예: 20244) — 순위·점수·사분면(필터·임계값 포함)을 그 분기 값으로"),
+):
+    """랭킹 목록 — 범주 필터 + 수치 임계값 + 정렬 + 페이지 (ranking_index.py)"""
+    ds = _dataset
+    if not ds.n_ranking:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    idx, r = ds.listing, ds.ranking
+    if sort not in idx.numeric:
+        raise HTTPException(status_code=400, detail=f"정렬할 수 없는 컬럼입니다 ({sort}).")
+    filters = {"gu": _split_values(gu), "type": _split_values(district_type),
+               "quadrant": [q.upper() for q in _split_values(quadrant)]}
+    for param, values in filters.items():
+        unknown = [v for v in values if v not in idx.bitmaps[param]]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"{param}: 알 수 없는 값입니다 ({', '.join(unknown)}).")
+
+    qi = _quarter_index(ds, as_of)
+
+    etag = f'"{ds.etag_version}-ranking-{hashlib.sha1(str(request.query_params).encode()).hexdigest()[:12]}"'
+    if _etag_matches(request, etag):
+        return _cached_response(request, b'', etag)
+
+    lower, upper = _parse_thresholds(ds, minimum, "min"), _parse_thresholds(ds, maximum, "max")
+    ranks, scores, quadrants = ds.rank, r['unified_score'], r['사분면']
+    perm = None
+    if qi is not None:
+        # 분기 기준: 그 분기 데이터가 있는 상권만, 순위·점수·사분면은 분기 행렬 값
+        # (사분면 필터와 순위·점수 임계값은 분기 값으로 perm에서 직접 거르고, 나머지는 RankingIndex가 처리)
+        h = ds.history
+        ranks, scores = h["rank"][qi], h["score"][qi]
+        perm = ds.quarter_order[qi]
+        if sort in QUARTER_SORTS:
+            if order and order != QUARTER_SORTS[sort]:  # 역순 — 동점은 기본 정렬과 같이 원래 행 순서 유지
+                perm = perm[np.argsort(-ranks[perm], kind='stable')]
+        else:
+            perm = idx.order[sort][order or "desc"]
+            perm = perm[ranks[perm] > 0]
+        if filters["quadrant"]:
+            ids = [QUADRANTS.index(q) for q in filters.pop("quadrant")]
+            perm = perm[np.isin(h["quadrant"][qi][perm], ids)]
+        quarter_values = {"unified_rank": ranks, "unified_score": scores}
+        for col in QUARTER_SORTS:
+            if col in lower:
+                perm = perm[quarter_values[col][perm] >= lower.pop(col)]
+            if col in upper:
+                perm = perm[quarter_values[col][perm] <= upper.pop(col)]
+
+    with _metrics.span("ranking_query"):
+        sel = idx.query(filters, lower, upper, sort, order, perm)
+    page = sel[offset:offset + limit].tolist()
+    # 정렬 컬럼 값은 행에 없는 컬럼일 때만 추가 (unified_rank → rank, unified_score → 반올림 값 그대로)
+    values = idx.numeric[sort] if sort not in ("unified_rank", "unified_score") else None
+    rows = []
+    for pos in page:
+        row = {
+            "rank": int(ranks[pos]), "district_name": ds.names[pos], "district_code": int(r['상권_코드'][pos]),
+            "gu": ds.gu[pos], "type": r['상권유형'][pos],
+            "quadrant": quadrants[pos] if qi is None else ds.quarter_quadrant(qi, pos),
+            "unified_score": round(float(scores[pos]), 4),
+        }
+        if values is not None:
+            v = values[pos]
+            row[sort] = None if v != v else (int(v) if v.is_integer() else float(v))
+        rows.append(row)
+    result = {"total": len(sel), "offset": offset, "limit": limit, "sort": sort,
+              "order": order or ("asc" if sort == "unified_rank" else "desc"), "results": rows}
+    if as_of is not None:
+        result["as_of"] = as_of
+    body = json_bytes(result)
+    return _cached_response(request, body, etag)
+
+@app.get("/ranking/filters")
+def ranking_filters(request: Request):
+    """/ranking 필터 선택지 (자치구·상권유형·사분면 값, 정렬/임계값 가능 컬럼)"""
+    ds = _dataset
+    body = json_bytes({**ds.listing.categories(), "columns": list(ds.listing.numeric), "quarters": ds.quarters})
+    return _cached_response(request, body, f'"{ds.etag_version}-ranking-filters"')
+
+RESCORE_TOP_MAX = 100
+
+@app.get("/rescore")
+def rescore_ranking(
+    request: Request,
+    w: float = Query(0.5, ge=0, le=1, description="잔차(검증된 수요) 비중 — 공급 비중은 1 - w"),
+    w1: float = Query(0.5, ge=0, le=1, description="공급: 찻집희소성 비중"),
+    w2: float | None = Query(None, ge=0, le=1, description="공급: 점포당매출 비중 (기본 1 - w1)"),
+    top: int = Query(20, ge=1, le=RESCORE_TOP_MAX),
+):
+    """사용자 가중치로 전체 상권 점수·순위 재계산 → 상위 top개 (scoring.py)
+
+    w=0.5, w1=0.5, w2=0.5가 현재 서비스 점수(unified_score)와 같은 식. w1/w2는 합이 1이 되도록 정규화
+    """
+    ds = _dataset
+    if not ds.n_ranking:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    if w2 is None:
+        w2 = 1 - w1
+    if w1 + w2 <= 0:
+        raise HTTPException(status_code=400, detail="w1, w2 중 하나는 0보다 커야 합니다.")
+    w1, w2 = w1 / (w1 + w2), w2 / (w1 + w2)
+
+    etag = f'"{ds.etag_version}-rescore-{w:.4f}-{w1:.4f}-{top}"'
+    if _etag_matches(request, etag):
+        return _cached_response(request, b'', etag)
+
+    with _metrics.span("rescore"):
+        score, residual, supply = ds.scoring.score(w, w1, w2)
+        order, ranks = ds.scoring.rank(score)
+    r = ds.ranking
+    rows = []
+    for pos in order[:top].tolist():
+        rows.append({
+            "rank": int(ranks[pos]), "base_rank": int(ds.rank[pos]),
+            "district_name": ds.names[pos], "district_code": int(r['상권_코드'][pos]),
+            "gu": ds.gu[pos], "quadrant": r['사분면'][pos],
+            "score": round(float(score[pos]), 4),
+            "residual_score": round(float(residual[pos]), 4), "supply_score": round(float(supply[pos]), 4),
+        })
+    body = json_bytes({"weights": {"w": w, "w1": round(w1, 4), "w2": round(w2, 4)},
+                       "total": ds.n_ranking, "results": rows})
+    return _cached_response(request, body, etag)
+
+COMPARE_MAX = 20
+
+def _lookup_codes(ds: Dataset, codes: str) -> tuple:
+    """'상권_코드,...' → (없는 코드, ranking 위치 배열) — 입력 순서 유지, 중복 제거"""
+    try:
+        requested = list(dict.fromkeys(int(c) for c in _split_values(codes)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="codes는 숫자 상권_코드를 쉼표로 구분해 입력해 주세요.")
+    if not requested or len(requested) > COMPARE_MAX:
+        raise HTTPException(status_code=400, detail=f"상권_코드를 1~{COMPARE_MAX}개 입력해 주세요.")
+    pos = [ds.pos_by_code.get(c) for c in requested]
+    missing = [c for c, p in zip(requested, pos) if p is None]
+    pos = np.array([p for p in pos if p is not None], dtype=np.int64)
+    if not len(pos):
+        raise HTTPException(status_code=404, detail="상권을 찾을 수 없습니다.")
+    return missing, pos
+
+@app.get("/compare")
+def compare_districts(request: Request,
+                      codes: str = Query(..., description="상권_코드 목록 (쉼표 구분, 최대 20개)"),
+                      as_of: int | None = Query(None, description="기준 분기 (예: 20244) — 순위·점수를 그 분기 값으로")):
+    """여러 상권 나란히 비교 — 수요 분위수·원값, 잔차, 공급 점수, 찻집 수, 순위를 입력 순서의 컬럼형 배열로 반환"""
+    ds = _dataset
+    if not ds.n_ranking:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    qi = _quarter_index(ds, as_of)
+    missing, pos = _lookup_codes(ds, codes)
+
+    columns = ds.compare_columns(pos)
+    extra = {}
+    if qi is not None:
+        columns.update(ds.quarter_columns(qi, pos))
+        extra["as_of"] = as_of
+    body = json_bytes({"count": len(pos), "missing": missing, **extra, **columns})
+    return _cached_response(request, body, f'"{ds.etag_version}-compare-{hashlib.sha1(body).hexdigest()[:12]}"')
+
+@app.get("/history")
+def district_history(request: Request,
+                     codes: str = Query(..., description="상권_코드 목록 (쉼표 구분, 최대 20개)")):
+    """상권별 분기 순위 추이 — 순위가 얼마나 안정적인지 (분기 × 상권 행렬에서 열 gather, 재계산 없음)
+
+    rank / score는 상권마다 quarters 순서의 배열 (그 분기 데이터 없으면 null)
+    """
+    ds = _dataset
+    if not ds.n_ranking:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    missing, pos = _lookup_codes(ds, codes)
+
+    h = ds.history
+    ranks, scores = h["rank"][:, pos].T, np.round(h["score"][:, pos].T, 4)
+    rank_lists = [[int(v) if v > 0 else None for v in row] for row in ranks.tolist()]
+    body = json_bytes({
+        "count": len(pos), "missing": missing, "quarters": ds.quarters,
+        "district_code": ds.ranking['상권_코드'][pos].tolist(),
+        "district_name": [ds.names[p] for p in pos.tolist()],
+        "rank": rank_lists,
+        "score": [[s if r is not None else None for s, r in zip(srow, rrow)]
+                  for srow, rrow in zip(scores.tolist(), rank_lists)],
+        "best_rank": [min((r for r in row if r), default=None) for row in rank_lists],
+        "worst_rank": [max((r for r in row if r), default=None) for row in rank_lists],
+    })
+    return _cached_response(request, body, f'"{ds.etag_version}-history-{hashlib.sha1(body).hexdigest()[:12]}"')
 
 @app.get("/scatter")
-def get_scatter_data():
-    """2D 매트릭스 scatter plot용 전체 상권 데이터"""
-    cols = ['상권_코드_명', 'supply_shortage', 'residual_latest', '사분면']
-    if df_ranking.empty:
-        return {"points": [], "threshold_x": 0.999, "threshold_y": 0.0}
-
-    sub = df_ranking[[c for c in cols + ['unified_rank'] if c in df_ranking.columns]].copy()
-    sub = sub.dropna(subset=['supply_shortage', 'residual_latest'])
-
-    # supply_shortage는 대부분 1.0에 몰려있어서 시각적 jitter 추가 (seed 고정)
-    rng = np.random.default_rng(42)
-    sub['x'] = sub['supply_shortage'] + rng.uniform(-0.025, 0.025, len(sub))
-    sub['y'] = sub['residual_latest']
-
-    out_cols = [c for c in ['상권_코드_명', 'x', 'y', '사분면', 'unified_rank'] if c in sub.columns]
-    return {
-        "points": sub[out_cols].to_dict(orient='records'),
-        "threshold_x": 0.999,
-        "threshold_y": 0.0,
-    }
+def get_scatter_data(request: Request):
+    """2D 매트릭스 scatter plot용 전체 상권 데이터 (컬럼형)"""
+    ds = _dataset
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        return _cached_response(request, ds.scatter_body_gz, f'"{ds.etag_version}-scatter-gz"',
+                                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return _cached_response(request, ds.scatter_body, f'"{ds.etag_version}-scatter"',
+                            headers={"Vary": "Accept-Encoding"})
+
+STARTUP_MS = round((time.perf_counter() - _T_START) * 1000, 1)
+print(f"Data loaded from {_dataset.source} in {_dataset.load_ms} ms "
+      f"(startup {STARTUP_MS} ms, version {_dataset.version})")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,160 @@
+# metrics.py
+# 엔드포인트/단계별 지연 히스토그램 + 요청·에러 카운터 → Prometheus text format
+#
+# 고정 버킷 히스토그램이라 관측 1회 = bisect + 카운터 증가 (~1µs) → 운영 환경에서 상시 사용 가능
+# p50/p95/p99는 버킷 경계 사이 선형 보간으로 근사 (정확한 값은 Prometheus에서 histogram_quantile 사용)
+
+import threading
+import time
+from bisect import bisect_left
+
+# 50µs ~ 10s (초 단위)
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """버킷 카운트로 분위수 근사 (버킷 내 선형 보간)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= target and c:
+                lo = BUCKETS[i - 1] if i > 0 else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lo + (hi - lo) * (target - seen) / c
+            seen += c
+        return BUCKETS[-1]
+
+
+class Registry:
+    """요청/단계 지연 히스토그램과 상태 코드별 요청 수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # sync 엔드포인트는 threadpool에서 실행됨
+        self.requests = {}             # endpoint → Histogram
+        self.stages = {}               # stage → Histogram
+        self.status = {}               # (endpoint, status) → count
+
+    def observe_request(self, endpoint: str, status: int, seconds: float) -> None:
+        with self._lock:
+            h = self.requests.get(endpoint)
+            if h is None:
+                h = self.requests[endpoint] = Histogram()
+            h.observe(seconds)
+            key = (endpoint, status)
+            self.status[key] = self.status.get(key, 0) + 1
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            h = self.stages.get(stage)
+            if h is None:
+                h = self.stages[stage] = Histogram()
+            h.observe(seconds)
+
+    def span(self, stage: str) -> "_Span":
+        """with metrics.span('kdtree'): ... — 블록 실행 시간을 stage 히스토그램에 기록"""
+        return _Span(self, stage)
+
+    def render(self, extra: list | None = None) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        with self._lock:
+            _render_histograms(lines, "aicha_request_duration_seconds", "endpoint", self.requests,
+                               "HTTP 요청 처리 시간 (엔드포인트별)")
+            _render_histograms(lines, "aicha_stage_duration_seconds", "stage", self.stages,
+                               "요청 처리 단계별 시간")
+            lines.append("# HELP aicha_requests_total HTTP 요청 수 (엔드포인트·상태 코드별)")
+            lines.append("# TYPE aicha_requests_total counter")
+            for (endpoint, status), n in sorted(self.status.items()):
+                lines.append(f'aicha_requests_total{{endpoint="{endpoint}",status="{status}"}} {n}')
+            lines.append("# HELP aicha_request_errors_total 4xx/5xx 응답 수 (엔드포인트별)")
+            lines.append("# TYPE aicha_request_errors_total counter")
+            errors = {}
+            for (endpoint, status), n in self.status.items():
+                if status >= 400:
+                    errors[endpoint] = errors.get(endpoint, 0) + n
+            for endpoint, n in sorted(errors.items()):
+                lines.append(f'aicha_request_errors_total{{endpoint="{endpoint}"}} {n}')
+        for name, kind, help_, samples in extra or []:
+            lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _Span:
+    __slots__ = ("registry", "stage", "t0")
+
+    def __init__(self, registry: Registry, stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe_stage(self.stage, time.perf_counter() - self.t0)
+        return False
+
+
+def _render_histograms(lines, name, label, hists, help_):
+    lines.append(f"# HELP {name} {help_}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, h in sorted(hists.items()):
+        cumulative = 0
+        for bound, c in zip(BUCKETS + (float("inf"),), h.counts):
+            cumulative += c
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {h.sum:.6f}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {h.count}')
+    # p50/p95/p99 근사값 (대시보드 없이 바로 확인용 gauge)
+    lines.append(f"# HELP {name}_quantile {help_} — 분위수 근사")
+    lines.append(f"# TYPE {name}_quantile gauge")
+    for key, h in sorted(hists.items()):
+        for q in QUANTILES:
+            lines.append(f'{name}_quantile{{{label}="{key}",quantile="{q}"}} {h.quantile(q):.6f}')
+
+
+class MetricsMiddleware:
+    """엔드포인트(라우트 경로 템플릿)별 지연·상태 코드 기록 — 순수 ASGI 미들웨어"""
+
+    def __init__(self, app, registry: Registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # 라우트 템플릿('/rank/{n}') 기준 → 레이블 수가 요청 경로 수만큼 늘지 않음
+            endpoint = getattr(route, "path", None) or "unmatched"
+            self.registry.observe_request(endpoint, status, time.perf_counter() - t0)
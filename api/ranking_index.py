@@ -0,0 +1,73 @@
+# ranking_index.py
+# 랭킹 목록(/ranking) 조회 인덱스 — 로드 시 1회 생성, 요청마다 DataFrame 질의 대신 배열 연산만 수행
+#
+#   - 범주 필터 (자치구·상권유형·사분면): 값별 bitmap(bool 배열) → 같은 범주는 OR, 범주끼리 AND
+#   - 정렬: 정렬 가능 컬럼마다 오름차순/내림차순 permutation 미리 계산 (NaN은 항상 뒤)
+#   - 요청 = bitmap 교집합 + 수치 임계값 비교 → permutation 순서로 걸러 offset:offset+limit slice
+
+import numpy as np
+
+CATEGORIES = {
+    "gu": "자치구_코드_명",
+    "type": "상권유형",
+    "quadrant": "사분면",
+}
+DEFAULT_SORT = "unified_rank"
+_NOT_SORTABLE = {"상권_코드", "블루오션_랭킹", "is_blueocean"}  # 식별자 / unified_rank 중복 / 전부 NaN
+
+
+class RankingIndex:
+    def __init__(self, ranking: dict, gu: list):
+        n = len(ranking.get('상권_코드_명', []))
+        self.n = n
+        columns = {**ranking, "자치구_코드_명": gu}
+
+        # 범주 bitmap — 사분면은 라벨 접두어(Q1_검증시장공백 → Q1)로 조회
+        self.bitmaps = {}
+        for param, col in CATEGORIES.items():
+            values = columns.get(col) or [None] * n
+            maps = {}
+            for i, v in enumerate(values):
+                if v is None:
+                    continue
+                key = str(v).split('_')[0] if param == "quadrant" else str(v)
+                if key not in maps:
+                    maps[key] = np.zeros(n, dtype=np.bool_)
+                maps[key][i] = True
+            self.bitmaps[param] = maps
+
+        # 수치 컬럼 (정렬·임계값 대상) + 미리 정렬한 permutation
+        self.numeric = {c: np.asarray(v, dtype=np.float64) for c, v in ranking.items()
+                        if isinstance(v, np.ndarray) and v.dtype.kind in 'fiu' and c not in _NOT_SORTABLE
+                        and not np.isnan(v.astype(np.float64)).all()}
+        self.order = {}
+        for c, v in self.numeric.items():
+            nan = np.isnan(v)
+            asc = np.lexsort((v, nan))                 # NaN 뒤, 동률은 원래 행 순서
+            desc = np.lexsort((-np.nan_to_num(v), nan))
+            self.order[c] = {"asc": asc.astype(np.int32), "desc": desc.astype(np.int32)}
+
+    def categories(self) -> dict:
+        """범주별 값 목록 (필터 선택지)"""
+        return {param: sorted(maps) for param, maps in self.bitmaps.items()}
+
+    def query(self, filters: dict, minimum: dict, maximum: dict,
+              sort: str = DEFAULT_SORT, order: str | None = None, perm: np.ndarray | None = None) -> np.ndarray:
+        """조건에 맞는 행 위치를 정렬 순서대로 반환 — 호출 측에서 slice로 페이지 추출
+
+        filters: {"gu": [...], "type": [...], "quadrant": [...]} (없는 값은 KeyError)
+        minimum / maximum: {수치 컬럼: 임계값} (이상 / 이하)
+        perm: 정렬 순서 직접 지정 (분기별 순위 등, sort/order 대신 사용 — 포함되지 않은 행은 제외)
+        """
+        mask = np.ones(self.n, dtype=np.bool_)
+        for param, values in filters.items():
+            if values:
+                maps = self.bitmaps[param]
+                mask &= np.logical_or.reduce([maps[v] for v in values])
+        for c, t in minimum.items():
+            mask &= self.numeric[c] >= t
+        for c, t in maximum.items():
+            mask &= self.numeric[c] <= t
+        if perm is None:
+            perm = self.order[sort][order or ("asc" if sort == DEFAULT_SORT else "desc")]
+        return perm[mask[perm]]
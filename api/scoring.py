@@ -0,0 +1,141 @@
+# scoring.py
+# 사용자 가중치로 블루오션 점수 재계산 (/rescore) — work/35_blueocean_score.py + 35_blueocean_smoothing.py와 같은 식
+#
+#   supply   = w1 · pct(supply_shortage) + w2 · pct(cafe_revenue_per_store)      (찻집희소성 / 점포당매출)
+#   smoothed = 0.7 · supply + 0.3 · 반경 500m 인접 상권 supply 평균 (인접 상권 없으면 supply 그대로)
+#   score    = w · pct(residual_latest) + (1 - w) · smoothed,  순위 = score 내림차순 (동점은 같은 최소 순위)
+#
+# 분위수(pct)는 가중치와 무관 → 로드 시 1회 계산. 인접 상권 목록은 CSR(offsets/index)로 스냅샷에 저장
+# 요청마다: 가중합 + reduceat(인접 평균) + argsort 1회 (상권 ~1,000개 기준 수십 µs)
+#
+# 분기별 순위 (?as_of=): 9분기 OOF 잔차(quarterly_residuals.csv)로 같은 식을 분기 × 상권 행렬 한 번에 계산
+#   분기마다 데이터가 있는 상권만 분위수·순위 대상, 인접 평균도 그 분기에 있는 인접 상권만 사용
+#   점포당매출의 카페음료_점포수는 서비스 점수와 같이 9분기 평균 사용 (35_blueocean_score.py)
+#   사분면도 분기마다 서비스 라벨(unified_ranking.csv 사분면)과 같은 규칙으로 분류:
+#   잔차 부호 × 평활화 공급점수(q1_supply_score)가 그 분기 중앙값 이상인지 — 최신 분기에서 1,036개 전부 일치
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+SMOOTHING_RADIUS = 500.0   # m
+SMOOTHING_WEIGHT = 0.3     # 인접 상권 평균 비중
+DEFAULT_WEIGHTS = (0.5, 0.5, 0.5)  # w(잔차), w1(찻집희소성), w2(점포당매출)
+
+
+def build_neighbors(x: np.ndarray, y: np.ndarray, radius: float = SMOOTHING_RADIUS) -> dict:
+    """상권 좌표 → 반경 내 인접 상권 CSR (자기 자신 제외, 좌표 NaN은 인접 없음)"""
+    n = len(x)
+    ok = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    lists = [[] for _ in range(n)]
+    if len(ok):
+        pts = np.column_stack([x[ok], y[ok]])
+        for i, nbrs in zip(ok, cKDTree(pts).query_ball_point(pts, radius)):
+            lists[i] = sorted(int(ok[j]) for j in nbrs if ok[j] != i)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(nb) for nb in lists], out=offsets[1:])
+    index = np.array([j for nb in lists for j in nb], dtype=np.int32)
+    return {"offsets": offsets, "index": index}
+
+
+def percentile(v: np.ndarray) -> np.ndarray:
+    """pandas rank(pct=True)와 같은 분위수 (동점 평균 순위 / n)
+
+    numpy만 사용 — scipy.stats import(~0.8초)를 스냅샷 로드 경로에서 제외
+    """
+    v = np.asarray(v, dtype=np.float64)
+    order = np.argsort(v, kind='stable')
+    sv = v[order]
+    first = np.r_[True, sv[1:] != sv[:-1]]               # 동점 그룹 시작
+    starts = np.r_[np.flatnonzero(first), len(v)]
+    avg = (starts[:-1] + 1 + starts[1:]) / 2              # 그룹별 평균 순위 (1부터)
+    ranks = np.empty(len(v), dtype=np.float64)
+    ranks[order] = avg[np.cumsum(first) - 1]
+    return ranks / len(v)
+
+
+class ScoreModel:
+    def __init__(self, ranking: dict, neighbors: dict):
+        n = len(ranking.get('상권_코드_명', []))
+        self.n = n
+        if not n:
+            return
+        self.residual_pct = percentile(ranking['residual_latest'])
+        self.scarcity_pct = percentile(ranking['supply_shortage'])
+        self.revenue_pct = percentile(ranking['cafe_revenue_per_store'])
+
+        offsets = np.asarray(neighbors["offsets"], dtype=np.int64)
+        self.nbr_index = np.asarray(neighbors["index"], dtype=np.int64)
+        counts = np.diff(offsets)
+        self.has_nbr = counts > 0
+        self.nbr_count = counts[self.has_nbr]
+        self.nbr_starts = offsets[:-1][self.has_nbr]  # reduceat 구간 시작 (빈 구간 제외)
+
+    def score(self, w: float, w1: float, w2: float) -> tuple:
+        """→ (score, residual 성분, smoothed supply 성분) 배열"""
+        supply = w1 * self.scarcity_pct + w2 * self.revenue_pct
+        smoothed = supply.copy()
+        if len(self.nbr_index):
+            nbr_mean = np.add.reduceat(supply[self.nbr_index], self.nbr_starts) / self.nbr_count
+            smoothed[self.has_nbr] = (1 - SMOOTHING_WEIGHT) * supply[self.has_nbr] + SMOOTHING_WEIGHT * nbr_mean
+        return w * self.residual_pct + (1 - w) * smoothed, self.residual_pct, smoothed
+
+    @staticmethod
+    def rank(score: np.ndarray) -> tuple:
+        """점수 내림차순 순서 + 순위 (rank(ascending=False, method='min')과 동일)
+
+        합산 순서에 따른 1e-16 수준 오차로 동점이 갈리지 않도록 소수 12자리로 반올림해 비교
+        """
+        score = np.round(score, 12)
+        order = np.argsort(-score, kind='stable')
+        desc = -score[order]
+        ranks = np.empty(len(score), dtype=np.int64)
+        ranks[order] = np.searchsorted(desc, desc, side='left') + 1
+        return order, ranks
+
+
+def score_quarters(residual: np.ndarray, shortage: np.ndarray, revenue: np.ndarray, neighbors: dict,
+                   w: float = DEFAULT_WEIGHTS[0], w1: float = DEFAULT_WEIGHTS[1],
+                   w2: float = DEFAULT_WEIGHTS[2]) -> dict:
+    """분기 × 상권 입력 행렬 (NaN: 그 분기 데이터 없음) → 분위수·공급·점수·순위 행렬
+
+    rank는 분기별 점수 내림차순 (동점은 같은 최소 순위, ScoreModel.rank와 같은 반올림), 데이터 없으면 0
+    quadrant는 Q1~Q4 → 0~3 (dataset.QUADRANTS 순서), 데이터 없으면 -1
+    CSV 로드(스냅샷 생성) 때만 호출 → scipy.stats는 여기서만 import
+    """
+    from scipy.stats import rankdata
+
+    present = ~np.isnan(residual)
+    count = present.sum(axis=1, keepdims=True)
+
+    def pct(v):
+        return rankdata(np.where(present, v, np.nan), method='average', axis=1, nan_policy='omit') / count
+
+    residual_pct = pct(residual)
+    supply = w1 * pct(shortage) + w2 * pct(revenue)
+
+    smoothed = supply.copy()
+    offsets = np.asarray(neighbors["offsets"], dtype=np.int64)
+    index = np.asarray(neighbors["index"], dtype=np.int64)
+    if len(index):
+        has_nbr = np.diff(offsets) > 0
+        starts = offsets[:-1][has_nbr]
+        nbr_sum = np.add.reduceat(np.nan_to_num(supply)[:, index], starts, axis=1)
+        nbr_cnt = np.add.reduceat(present[:, index].astype(np.int64), starts, axis=1)
+        own = supply[:, has_nbr]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mixed = (1 - SMOOTHING_WEIGHT) * own + SMOOTHING_WEIGHT * (nbr_sum / nbr_cnt)
+        smoothed[:, has_nbr] = np.where(nbr_cnt > 0, mixed, own)
+
+    score = w * residual_pct + (1 - w) * smoothed
+
+    # 사분면: 공급점수 중앙값 이상 → 잔차 ≥ 0이면 Q1, 음수면 Q2 / 미만 → 잔차 음수면 Q3, 아니면 Q4
+    with np.errstate(invalid='ignore'):
+        scarce = smoothed >= np.nanmedian(np.where(present, smoothed, np.nan), axis=1, keepdims=True)
+        negative = residual < 0
+    quadrant = np.where(scarce, np.where(negative, 1, 0), np.where(negative, 2, 3)).astype(np.int8)
+    quadrant[~present] = -1
+    ranks = rankdata(-np.round(score, 12), method='min', axis=1, nan_policy='omit')
+    return {
+        "residual_pct": residual_pct, "supply": smoothed, "score": score,
+        "rank": np.nan_to_num(ranks).astype(np.int32), "quadrant": quadrant,
+    }
@@ -0,0 +1,356 @@
+# snapshot.py
+# API 데이터 로드 — CSV 5종(unified_ranking / to_map / teashops / station_coords / quarterly_residuals) 또는 바이너리 스냅샷
+#
+# 스냅샷(snapshot.bin)은 CSV를 파싱·정제한 결과를 컬럼 단위로 저장한 파일:
+#   - 숫자 컬럼 : typed array 그대로 (64바이트 정렬, mmap → np.frombuffer로 복사 없이 로드)
+#   - 문자열 컬럼: UTF-8 blob + offset 테이블 (+ 결측 mask)
+#   - KDTree 입력: ranked 상권 좌표 (n, 2) float64
+#   - bytes 컬럼 : 사전 직렬화된 응답 payload (dataset.py) — 로드 시 디코딩 없이 mmap slice
+# API 시작 시 pandas import/CSV 파싱 없이 로드 → Render 콜드 스타트 단축
+# 여러 워커가 같은 파일을 mmap → 데이터 페이지는 OS page cache에서 공유 (워커 수만큼 복제되지 않음)
+#
+# 생성: python snapshot.py  (파이프라인에서는 work/42_build_snapshot.py)
+# 사용 조건: CSV 내용 해시(version) + 형식 번호(FORMAT_VERSION) + 로더 코드 해시(LOADER_VERSION)가 모두 일치
+#   → 이전 코드로 만든 스냅샷(새 컬럼 없음)은 CSV가 같아도 거부하고 CSV로 로드
+#
+# 파일 구조:
+#   MAGIC(8) | header 길이(u64 LE) | header JSON | padding | 컬럼 blob들 (각 64바이트 정렬)
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+
+import numpy as np
+
+MAGIC = b'AICHASNP'
+FORMAT_VERSION = 5  # 테이블·컬럼을 추가/변경하면 올림 (3: map lat/lon, 4: shops 필수, 5: history quadrant)
+ALIGN = 64
+SOURCE_FILES = ("unified_ranking.csv", "to_map.csv", "teashops.csv", "station_coords.csv", "quarterly_residuals.csv")
+SNAPSHOT_FILE = "snapshot.bin"
+LOADER_FILES = ("snapshot.py", "gazetteer.py", "geocache.py", "scoring.py")  # load_csv 결과를 정하는 코드
+
+
+def _loader_version() -> str:
+    """CSV → 테이블 변환 코드 해시 — 코드가 바뀌면 이전 스냅샷은 CSV 해시가 같아도 사용하지 않음"""
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in LOADER_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+LOADER_VERSION = _loader_version()
+
+
+def data_version(data_dir: str) -> str:
+    """CSV 5종 내용 해시 — 데이터 스냅샷 버전 (ETag/스냅샷 유효성 기준)"""
+    h = hashlib.sha256()
+    for name in SOURCE_FILES:
+        try:
+            with open(os.path.join(data_dir, name), 'rb') as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b'-')
+    return h.hexdigest()[:16]
+
+
+def source_signature(data_dir: str) -> tuple:
+    """CSV 5종 + 스냅샷 파일의 (mtime, 크기) — 변경 감시용 (내용 해시보다 저렴)"""
+    sig = []
+    for name in SOURCE_FILES + (SNAPSHOT_FILE,):
+        try:
+            st = os.stat(os.path.join(data_dir, name))
+            sig.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((name, None, None))
+    return tuple(sig)
+
+
+def empty_data(version: str = "") -> dict:
+    return {
+        "version": version,
+        "source": "empty",
+        "ranking": {},
+        "map": {"상권_코드_명": [], "엑스좌표_값": np.empty(0), "와이좌표_값": np.empty(0), "자치구_코드_명": [],
+                "lat": np.empty(0), "lon": np.empty(0)},
+        "teashops": {"codes": np.empty(0, dtype=np.int64), "offsets": np.zeros(1, dtype=np.int64), "names": []},
+        "places": {"name": [], "kind": [], "gu": [], "x": np.empty(0), "y": np.empty(0)},
+        "neighbors": {"offsets": np.zeros(1, dtype=np.int64), "index": np.empty(0, dtype=np.int32)},
+        "shops": {"가게명": [], "카테고리": [], "도로명주소": [], "상권_코드_명": [], "상권_코드": np.empty(0, dtype=np.int64),
+                  "lat": np.empty(0), "lon": np.empty(0), "x": np.empty(0), "y": np.empty(0)},
+        "history": {"quarters": np.empty(0, dtype=np.int64), "residual_pct": np.empty((0, 0)),
+                    "supply": np.empty((0, 0)), "score": np.empty((0, 0)), "rank": np.empty((0, 0), dtype=np.int32),
+                    "quadrant": np.empty((0, 0), dtype=np.int8)},
+    }
+
+
+# 로드 결과에 반드시 있어야 하는 테이블 (스냅샷에 없으면 오래된 스냅샷으로 보고 거부)
+REQUIRED_TABLES = tuple(empty_data())[2:]
+
+
+# ══════════════════════════════════════════════════════════════
+# CSV 로드 (pandas) — 스냅샷이 없거나 오래된 경우의 fallback + 스냅샷 생성 입력
+# ══════════════════════════════════════════════════════════════
+def _to_column(s):
+    """pandas Series → 숫자는 np.ndarray, 문자열은 list[str | None]"""
+    if s.dtype.kind in 'fiub':
+        return np.ascontiguousarray(s.to_numpy())
+    return [None if (v is None or v != v) else str(v) for v in s.tolist()]
+
+
+def load_csv(data_dir: str) -> dict:
+    import pandas as pd
+    from pyproj import Transformer
+
+    from gazetteer import build_places
+    from scoring import build_neighbors, score_quarters
+
+    df_map = pd.read_csv(os.path.join(data_dir, "to_map.csv"))
+    # 35_blueocean_ranking.csv 에서 복사된 파일 (1,038개 상권 전체 데이터)
+    df_ranking = pd.read_csv(os.path.join(data_dir, "unified_ranking.csv"))
+    # 찻집 위치 데이터 (가게명 조회용)
+    df_teashops = pd.read_csv(os.path.join(data_dir, "teashops.csv"))
+    # 지하철역 좌표 (work/17_build_search_keywords.py에서 수집, 지명 사전용)
+    df_stations = pd.read_csv(os.path.join(data_dir, "station_coords.csv"), encoding="utf-8-sig")
+    # 분기별 OOF 잔차·찻집 수·매출 (work/35_blueocean_smoothing.py에서 생성, 분기별 순위용)
+    df_quarterly = pd.read_csv(os.path.join(data_dir, "quarterly_residuals.csv"), encoding="utf-8-sig")
+
+    # NaN 처리
+    df_ranking['찻집수_latest'] = df_ranking['찻집수_latest'].fillna(0)
+    df_ranking['매출_latest'] = df_ranking['매출_latest'].fillna(0)
+    df_ranking['사분면'] = df_ranking['사분면'].fillna('일반 상권')
+    df_ranking['블루오션_랭킹'] = pd.to_numeric(df_ranking['블루오션_랭킹'], errors='coerce').fillna(9999)
+
+    # 블루오션_랭킹: unified_ranking.csv에 저장된 값 그대로 사용
+    # (35_blueocean_smoothing.py에서 통합 스코어 기준으로 산정됨)
+    df_ranking['unified_rank'] = df_ranking['블루오션_랭킹'].astype(np.int64)
+
+    # _pct 컬럼은 unified_ranking.csv에 미리 저장됨 (precompute_pct.py로 생성)
+    # startup 시 rank 연산 불필요 → Render 콜드 스타트 타임아웃 방지
+
+    # KDTree 입력 — ranked 상권(unified_ranking.csv)만 사용해 항상 유효한 매핑 보장
+    df_map_ranked = df_map[df_map['상권_코드_명'].isin(set(df_ranking['상권_코드_명']))].reset_index(drop=True)
+
+    # 점수 평활화용 인접 상권 (반경 500m, ranking 행 순서) — 35_blueocean_smoothing.py와 같이 상권_코드로 좌표 매핑
+    ranking_xy = (df_map.drop_duplicates('상권_코드').set_index('상권_코드')[['엑스좌표_값', '와이좌표_값']]
+                  .reindex(df_ranking['상권_코드']).to_numpy(dtype=np.float64))
+
+    neighbors = build_neighbors(ranking_xy[:, 0], ranking_xy[:, 1])
+
+    # 분기 × 상권 입력 행렬 (ranking 행 순서, 그 분기 데이터 없으면 NaN) → 분기별 점수·순위 (scoring.py)
+    def quarter_matrix(col):
+        return (df_quarterly.pivot(index='기준_년분기_코드', columns='상권_코드', values=col)
+                .reindex(columns=df_ranking['상권_코드']).to_numpy(dtype=np.float64))
+
+    history = score_quarters(quarter_matrix('oof_residual'),
+                             1 / (quarter_matrix('찻집_수') + 1),                        # supply_shortage
+                             quarter_matrix('당월_매출_금액') / (df_ranking['카페음료_점포수'].to_numpy() + 1),
+                             neighbors)
+    history["quarters"] = np.sort(df_quarterly['기준_년분기_코드'].unique()).astype(np.int64)
+
+    # 지도 표시용 위경도 (TM → WGS84, /bbox 응답)
+    map_lon, map_lat = Transformer.from_crs("EPSG:5181", "EPSG:4326", always_xy=True).transform(
+        df_map_ranked['엑스좌표_값'].to_numpy(dtype=np.float64), df_map_ranked['와이좌표_값'].to_numpy(dtype=np.float64))
+
+    # 찻집 위치 (반경 검색용) — 19_map_tea_shops.py와 같이 WGS84 → TM(EPSG:5181) 변환
+    shops = df_teashops.dropna(subset=['lon', 'lat']).reset_index(drop=True)
+    shop_x, shop_y = Transformer.from_crs("EPSG:4326", "EPSG:5181", always_xy=True).transform(
+        shops['lon'].to_numpy(dtype=np.float64), shops['lat'].to_numpy(dtype=np.float64))
+
+    # 찻집 가게명 — 상권_코드별 CSR (codes[i]의 가게명 = names[offsets[i]:offsets[i+1]], CSV 순서 유지)
+    tea = df_teashops.dropna(subset=['가게명', '상권_코드'])
+    codes, offsets, names = [], [0], []
+    for code, group in tea.groupby('상권_코드', sort=False)['가게명']:
+        codes.append(int(code))
+        names.extend(str(n) for n in group)
+        offsets.append(len(names))
+
+    return {
+        "version": data_version(data_dir),
+        "source": "csv",
+        "ranking": {c: _to_column(df_ranking[c]) for c in df_ranking.columns},
+        "map": {
+            "상권_코드_명": _to_column(df_map_ranked['상권_코드_명']),
+            "엑스좌표_값": df_map_ranked['엑스좌표_값'].to_numpy(dtype=np.float64),
+            "와이좌표_값": df_map_ranked['와이좌표_값'].to_numpy(dtype=np.float64),
+            "자치구_코드_명": _to_column(df_map_ranked['자치구_코드_명']),
+            "lat": np.asarray(map_lat, dtype=np.float64),
+            "lon": np.asarray(map_lon, dtype=np.float64),
+        },
+        "teashops": {
+            "codes": np.array(codes, dtype=np.int64),
+            "offsets": np.array(offsets, dtype=np.int64),
+            "names": names,
+        },
+        "shops": {
+            **{c: _to_column(shops[c]) for c in ('가게명', '카테고리', '도로명주소', '상권_코드_명')},
+            "상권_코드": shops['상권_코드'].fillna(0).to_numpy(dtype=np.int64),
+            "lat": shops['lat'].to_numpy(dtype=np.float64),
+            "lon": shops['lon'].to_numpy(dtype=np.float64),
+            "x": np.asarray(shop_x, dtype=np.float64),
+            "y": np.asarray(shop_y, dtype=np.float64),
+        },
+        "neighbors": neighbors,
+        "history": history,
+        # 오프라인 지명 사전 (gazetteer.py) — 전체 상권(랭킹 외 포함)·역·행정동·자치구
+        "places": build_places(df_map, df_stations,
+                               Transformer.from_crs("EPSG:4326", "EPSG:5181", always_xy=True)),
+    }
+
+
+# ══════════════════════════════════════════════════════════════
+# 바이너리 스냅샷 쓰기/읽기
+# ══════════════════════════════════════════════════════════════
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+class BlobList:
+    """mmap 위 가변 길이 bytes 목록 — 항목 접근 시 memoryview slice 반환 (복사 없음)"""
+    __slots__ = ("_buf", "_offsets")
+
+    def __init__(self, buf: memoryview, offsets: np.ndarray):
+        self._buf = buf
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> memoryview:
+        return self._buf[self._offsets[i]:self._offsets[i + 1]]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def write_snapshot(path: str, data: dict) -> int:
+    """data(load_csv 결과) → 스냅샷 파일. 쓴 바이트 수 반환 (임시 파일 작성 후 rename)"""
+    blobs, cursor = [], 0
+
+    def add_blob(arr: np.ndarray) -> dict:
+        nonlocal cursor
+        arr = np.ascontiguousarray(arr)
+        spec = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": cursor}
+        blobs.append((cursor, arr.tobytes()))
+        cursor = _align(cursor + arr.nbytes)
+        return spec
+
+    tables = {}
+    for table, columns in data.items():
+        if not isinstance(columns, dict):
+            continue  # version / source
+        cols = []
+        for name, col in columns.items():
+            if isinstance(col, np.ndarray):
+                cols.append({"name": name, "kind": "array", "data": add_blob(col)})
+                continue
+            if col and isinstance(col[0], (bytes, memoryview)):
+                offsets = np.zeros(len(col) + 1, dtype=np.int64)
+                np.cumsum([len(b) for b in col], out=offsets[1:])
+                cols.append({
+                    "name": name, "kind": "bytes",
+                    "offsets": add_blob(offsets),
+                    "data": add_blob(np.frombuffer(b''.join(col), dtype=np.uint8)),
+                })
+                continue
+            encoded = [b'' if v is None else v.encode('utf-8') for v in col]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            nulls = np.array([v is None for v in col], dtype=np.bool_)
+            cols.append({
+                "name": name, "kind": "str",
+                "offsets": add_blob(offsets),
+                "data": add_blob(np.frombuffer(b''.join(encoded), dtype=np.uint8)),
+                "nulls": add_blob(nulls) if nulls.any() else None,
+            })
+        tables[table] = cols
+
+    header = json.dumps({"format": FORMAT_VERSION, "loader": LOADER_VERSION, "version": data["version"],
+                         "tables": tables},
+                        ensure_ascii=False).encode('utf-8')
+    base = _align(len(MAGIC) + 8 + len(header))
+
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + len(header).to_bytes(8, 'little') + header)
+        for offset, raw in blobs:
+            f.seek(base + offset)
+            f.write(raw)
+        f.truncate(base + cursor)
+    os.replace(tmp, path)
+    return base + cursor
+
+
+def read_snapshot(path: str) -> dict:
+    """스냅샷 mmap 로드 — 숫자 컬럼은 파일 페이지를 그대로 가리키는 읽기 전용 배열"""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"not a snapshot file: {path}")
+    hlen = int.from_bytes(mm[len(MAGIC):len(MAGIC) + 8], 'little')
+    start = len(MAGIC) + 8
+    header = json.loads(mm[start:start + hlen].decode('utf-8'))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"snapshot format {header.get('format')} != {FORMAT_VERSION}")
+    if header.get("loader") != LOADER_VERSION:
+        raise ValueError(f"snapshot loader {header.get('loader')} != {LOADER_VERSION} (built by other code)")
+    base = _align(start + hlen)
+
+    def array(spec) -> np.ndarray:
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        return np.frombuffer(mm, dtype=spec["dtype"], count=count,
+                             offset=base + spec["offset"]).reshape(spec["shape"])
+
+    def strings(col) -> list:
+        offsets = array(col["offsets"])
+        blob = mm[base + col["data"]["offset"]:base + col["data"]["offset"] + int(offsets[-1])]
+        out = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+        if col["nulls"] is not None:
+            for i in np.flatnonzero(array(col["nulls"])):
+                out[i] = None
+        return out
+
+    def blobs(col) -> BlobList:
+        start = base + col["data"]["offset"]
+        return BlobList(memoryview(mm)[start:start + col["data"]["shape"][0]], array(col["offsets"]))
+
+    missing = [t for t in REQUIRED_TABLES if t not in header["tables"]]
+    if missing:  # 이전 코드로 만든 스냅샷 — 빈 값으로 대체하지 않고 CSV로 다시 로드
+        raise ValueError(f"snapshot is missing tables: {', '.join(missing)}")
+
+    readers = {"array": lambda c: array(c["data"]), "str": strings, "bytes": blobs}
+    data = {"version": header["version"], "source": "snapshot"}
+    for table, cols in header["tables"].items():
+        data[table] = {c["name"]: readers[c["kind"]](c) for c in cols}
+    return data
+
+
+def load_data(data_dir: str) -> dict:
+    """스냅샷이 CSV와 같은 버전이면 스냅샷, 아니면 CSV 로드 (실패 시 빈 데이터)"""
+    version = data_version(data_dir)
+    path = os.path.join(data_dir, SNAPSHOT_FILE)
+    if os.path.exists(path):
+        try:
+            data = read_snapshot(path)
+            if data["version"] == version:
+                return data
+            print(f"Snapshot {data['version']} is stale (CSV {version}) — loading CSV")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading snapshot: {e}")
+    try:
+        return load_csv(data_dir)
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return empty_data(version)
+
+
+if __name__ == "__main__":
+    from dataset import build_snapshot  # 응답 payload까지 포함해 생성 (dataset.py)
+
+    data_dir = os.path.dirname(os.path.abspath(__file__))
+    out = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_dir, SNAPSHOT_FILE)
+    size = build_snapshot(data_dir, out)
+    print(f"Snapshot written: {out} ({size:,} bytes)")
@@ -0,0 +1,42 @@
+# spatial.py
+# 균일 격자 공간 인덱스 — 지도 화면 영역(bbox) 안의 점을 찾을 때 사용
+#
+# 점을 cell_size(m) 격자 칸 번호(행 우선) 순으로 정렬해 두고 칸별 시작 위치(CSR)만 저장
+# → 영역 질의 = 겹치는 격자 행마다 연속 구간 1개 slice + 경계 칸 정밀 비교
+
+import numpy as np
+
+GRID_CELL = 500.0  # m
+
+
+class GridIndex:
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell: float = GRID_CELL):
+        self.x, self.y = x, y
+        self.cell = cell
+        if not len(x):
+            self.nx = self.ny = 0
+            return
+        self.x0, self.y0 = float(x.min()), float(y.min())
+        self.nx = int((x.max() - self.x0) // cell) + 1
+        self.ny = int((y.max() - self.y0) // cell) + 1
+        cell_id = ((y - self.y0) // cell).astype(np.int64) * self.nx + ((x - self.x0) // cell).astype(np.int64)
+        self.order = np.argsort(cell_id, kind='stable')
+        self.starts = np.searchsorted(cell_id[self.order], np.arange(self.nx * self.ny + 1))
+
+    def query(self, xmin: float, ymin: float, xmax: float, ymax: float) -> np.ndarray:
+        """[xmin, xmax] × [ymin, ymax] 안의 점 인덱스 (원래 순서 기준)"""
+        if not self.nx or xmax < xmin or ymax < ymin:
+            return np.empty(0, dtype=np.int64)
+        ix0 = max(0, int((xmin - self.x0) // self.cell))
+        ix1 = min(self.nx - 1, int((xmax - self.x0) // self.cell))
+        iy0 = max(0, int((ymin - self.y0) // self.cell))
+        iy1 = min(self.ny - 1, int((ymax - self.y0) // self.cell))
+        if ix0 > ix1 or iy0 > iy1:
+            return np.empty(0, dtype=np.int64)
+        rows = np.arange(iy0, iy1 + 1) * self.nx
+        spans = [self.order[s:e] for s, e in zip(self.starts[rows + ix0], self.starts[rows + ix1 + 1]) if e > s]
+        if not spans:
+            return np.empty(0, dtype=np.int64)
+        cand = np.concatenate(spans)
+        x, y = self.x[cand], self.y[cand]
+        return cand[(x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)]
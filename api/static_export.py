@@ -0,0 +1,92 @@
+# static_export.py
+# 정적 JSON 내보내기 — 데이터가 바뀌는 건 파이프라인 재실행 때뿐이므로 조회 응답을 전부 파일로 미리 생성
+# → Vercel/CDN에서 바로 서빙, Python API는 자유 입력 주소 검색(지오코딩)에만 필요
+#
+# 출력 구조 (out_dir 아래):
+#   current.json                    현재 버전 포인터 {"version", "path"} — 캐시 짧게 (no-cache)
+#   v{version}/manifest.json        버전·생성 시각·파일 수  ({version} = 데이터 해시-응답 코드 해시)
+#   v{version}/rank/{n}.json        /rank/{n} 응답과 동일 (bytes 그대로)
+#   v{version}/district/{code}.json 상권_코드별 응답 (address = 상권명)
+#   v{version}/scatter.json         /scatter 응답
+#   v{version}/ranking.json         전체 랭킹 목록 (순위순, 컬럼형 — /compare와 같은 필드 + 상권유형)
+# 모든 .json 옆에 .json.gz (gzip -9) 함께 생성. 버전 디렉터리는 내용이 바뀌지 않음 → immutable 캐시 가능
+#
+# 실행: python static_export.py [out_dir]  (파이프라인에서는 work/43_export_static.py)
+
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from dataset import Dataset, json_bytes
+
+KEEP_VERSIONS = 2  # 배포 중 이전 버전을 보고 있는 클라이언트용으로 직전 버전까지 유지
+
+
+def _write(path: str, body: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(body)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+
+
+def export_static(ds: Dataset, out_dir: str, keep: int = KEEP_VERSIONS) -> dict:
+    """Dataset → 정적 JSON 트리. manifest 반환"""
+    if not ds.n_ranking:
+        raise ValueError("data not loaded")
+    name = f"v{ds.etag_version}"  # 응답 코드가 바뀌어도 새 디렉터리 (immutable 캐시)
+    final = os.path.join(out_dir, name)
+    tmp = final + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    files = 0
+    for n, pos in sorted(ds.pos_by_rank.items()):
+        if 1 <= n <= ds.total_ranked:  # /rank/{n}과 같은 범위
+            _write(os.path.join(tmp, "rank", f"{n}.json"), ds.district_body(pos, ds.names[pos]))
+            files += 1
+    for code, pos in ds.pos_by_code.items():
+        _write(os.path.join(tmp, "district", f"{code}.json"), ds.district_body(pos, ds.names[pos]))
+        files += 1
+    _write(os.path.join(tmp, "scatter.json"), ds.scatter_body)
+
+    order = np.argsort(ds.rank, kind='stable')
+    listing = {"count": len(order), "total_ranked": ds.total_ranked,
+               "type": [ds.ranking['상권유형'][p] for p in order.tolist()], **ds.compare_columns(order)}
+    _write(os.path.join(tmp, "ranking.json"), json_bytes(listing))
+    files += 2
+
+    manifest = {"version": ds.version, "path": name + "/", "files": files,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "source": ds.source}
+    _write(os.path.join(tmp, "manifest.json"), json_bytes(manifest))
+
+    # 버전 디렉터리 완성 후 교체 → current.json 갱신 (읽는 쪽은 항상 완성된 버전만 봄)
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    pointer = os.path.join(out_dir, "current.json")
+    with open(pointer + ".tmp", 'wb') as f:
+        f.write(json_bytes({"version": ds.version, "path": name + "/"}))
+    os.replace(pointer + ".tmp", pointer)
+
+    # 오래된 버전 정리 (최근 keep개 유지)
+    versions = sorted((d for d in os.listdir(out_dir) if d.startswith("v") and not d.endswith(".tmp")
+                       and os.path.isdir(os.path.join(out_dir, d))),
+                      key=lambda d: os.path.getmtime(os.path.join(out_dir, d)), reverse=True)
+    for old in versions[keep:]:
+        if old != name:
+            shutil.rmtree(os.path.join(out_dir, old), ignore_errors=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    data_dir = os.path.dirname(os.path.abspath(__file__))
+    out = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(data_dir), "frontend", "public", "static-api")
+    t0 = time.perf_counter()
+    result = export_static(Dataset.load(data_dir), out)
+    print(json.dumps(result, ensure_ascii=False))
+    print(f"{out} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
@@ -0,0 +1,64 @@
+# kakao_stub.py
+# 부하 테스트용 카카오 주소 검색 API 스텁 — 지연/실패율을 설정 가능
+#
+# 같은 query에는 항상 같은 좌표(서울 범위 내, query 해시 기반)를 돌려줌 → 재현 가능한 결과
+#
+# 단독 실행: python kakao_stub.py --port 9100 --latency-ms 80 --jitter-ms 20 --fail-rate 0.01
+#   → API는 KAKAO_API_URL=http://127.0.0.1:9100/v2/local/search/address.json 로 실행
+
+import argparse
+import asyncio
+import hashlib
+import random
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+# 서울 대략 범위 (WGS84)
+LAT_RANGE = (37.46, 37.68)
+LON_RANGE = (126.83, 127.16)
+
+
+def make_app(latency_ms: float = 50.0, jitter_ms: float = 10.0,
+             fail_rate: float = 0.0, notfound_rate: float = 0.0, seed: int = 0) -> FastAPI:
+    """지연(평균 ± jitter, 정규분포)·실패(500)·결과 없음 비율을 갖는 스텁 앱"""
+    app = FastAPI()
+    rng = random.Random(seed)
+    app.state.calls = 0
+
+    @app.get("/v2/local/search/address.json")
+    async def search(query: str = Query(...)):
+        app.state.calls += 1
+        delay = max(0.0, rng.gauss(latency_ms, jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        r = rng.random()
+        if r < fail_rate:
+            return JSONResponse({"errorType": "InternalError"}, status_code=500)
+        if r < fail_rate + notfound_rate:
+            return {"documents": [], "meta": {"total_count": 0}}
+
+        h = hashlib.sha1(query.encode('utf-8')).digest()
+        u = int.from_bytes(h[:4], 'big') / 2**32
+        v = int.from_bytes(h[4:8], 'big') / 2**32
+        lat = LAT_RANGE[0] + (LAT_RANGE[1] - LAT_RANGE[0]) * u
+        lon = LON_RANGE[0] + (LON_RANGE[1] - LON_RANGE[0]) * v
+        return {"documents": [{"address_name": query, "x": f"{lon:.7f}", "y": f"{lat:.7f}"}],
+                "meta": {"total_count": 1}}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="Kakao address API stub")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--notfound-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    uvicorn.run(make_app(args.latency_ms, args.jitter_ms, args.fail_rate, args.notfound_rate, args.seed),
+                host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,272 @@
+# loadtest.py
+# API 부하 테스트 — 카카오 스텁(kakao_stub.py)으로 외부 API를 대체하고
+# /search · /rank/{n} · /scatter 혼합 요청을 재생해 RPS와 지연 분위수를 측정
+#
+# 모드:
+#   inprocess : api/main.py를 같은 프로세스에서 import, ASGI로 직접 호출 (카카오 스텁도 ASGI)
+#   uvicorn   : 스텁과 API를 각각 uvicorn 서브프로세스로 띄우고 실제 HTTP로 호출
+#
+# 실행 예:
+#   python bench/loadtest.py --mode uvicorn --duration 20 --concurrency 64 --save bench/baseline.json
+#   python bench/loadtest.py --mode uvicorn --compare bench/baseline.json   # 이전 기준과 비교
+#
+# 워크로드는 --seed로 고정 (주소 풀·요청 순서 동일) → 커밋 간 비교 가능
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BASE)
+API_DIR = os.path.join(ROOT, 'api')
+STUB_PATH = "/v2/local/search/address.json"
+
+
+# ══════════════════════════════════════════════════════════════
+# 워크로드
+# ══════════════════════════════════════════════════════════════
+def build_address_pool(n: int, rng: random.Random) -> list:
+    """to_map.csv의 자치구·행정동으로 '서울 OO구 OO동 N' 형태의 주소 풀 생성"""
+    with open(os.path.join(API_DIR, 'to_map.csv'), encoding='utf-8-sig') as f:
+        areas = sorted({(r['자치구_코드_명'], r['행정동_코드_명']) for r in csv.DictReader(f)})
+    return [f"서울 {gu} {dong} {rng.randint(1, 300)}" for gu, dong in rng.choices(areas, k=n)]
+
+
+def build_plan(args, rng: random.Random):
+    """요청 생성기 — 주소는 Zipf 분포(인기 동네 반복 검색), 순위는 균등 분포"""
+    pool = build_address_pool(args.addresses, rng)
+    weights = [1.0 / (i + 1) ** args.zipf for i in range(len(pool))]
+    mix = {k: float(v) for k, v in (kv.split('=') for kv in args.mix.split(','))}
+    kinds, kind_w = list(mix), list(mix.values())
+
+    def next_request():
+        kind = rng.choices(kinds, kind_w)[0]
+        if kind == 'search':
+            return kind, "/search", {"address": rng.choices(pool, weights)[0]}
+        if kind == 'rank':
+            return kind, f"/rank/{rng.randint(1, args.max_rank)}", None
+        return kind, f"/{kind}", None
+
+    return next_request
+
+
+async def run_load(client: httpx.AsyncClient, args) -> dict:
+    """closed-loop: concurrency개 워커가 duration 동안 요청 반복 (warmup 구간은 집계 제외)"""
+    rng = random.Random(args.seed)
+    next_request = build_plan(args, rng)
+    samples = []  # (kind, status, seconds)
+    t_start = time.perf_counter()
+    t_measure = t_start + args.warmup
+    t_end = t_measure + args.duration
+
+    async def worker():
+        while True:
+            now = time.perf_counter()
+            if now >= t_end:
+                return
+            kind, path, params = next_request()
+            t0 = time.perf_counter()
+            try:
+                r = await client.get(path, params=params)
+                status = r.status_code
+            except httpx.HTTPError:
+                status = 0  # 연결 실패/타임아웃
+            t1 = time.perf_counter()
+            if t0 >= t_measure:
+                samples.append((kind, status, t1 - t0))
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return summarize(samples, args.duration)
+
+
+def _pct(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+def summarize(samples, duration: float) -> dict:
+    def stats(rows):
+        lat = sorted(s for _, _, s in rows)
+        errors = sum(1 for _, st, _ in rows if st == 0 or st >= 500)
+        return {
+            "count": len(rows),
+            "errors": errors,
+            "rps": round(len(rows) / duration, 1),
+            "mean_ms": round(1000 * sum(lat) / len(lat), 3) if lat else 0.0,
+            "p50_ms": round(1000 * _pct(lat, 0.50), 3),
+            "p90_ms": round(1000 * _pct(lat, 0.90), 3),
+            "p99_ms": round(1000 * _pct(lat, 0.99), 3),
+            "max_ms": round(1000 * lat[-1], 3) if lat else 0.0,
+        }
+
+    by_kind = {}
+    for row in samples:
+        by_kind.setdefault(row[0], []).append(row)
+    return {"total": stats(samples), "endpoints": {k: stats(v) for k, v in sorted(by_kind.items())}}
+
+
+# ══════════════════════════════════════════════════════════════
+# 대상 서버 구성
+# ══════════════════════════════════════════════════════════════
+def _api_env(stub_url: str) -> dict:
+    return {
+        "KAKAO_API_KEY": "bench",
+        "KAKAO_API_URL": stub_url,
+        "GEOCODE_CACHE_PATH": "",       # 디스크 캐시 끔 → 매 실행 같은 조건 (메모리 LRU만)
+        "DATA_WATCH_INTERVAL": "0",
+    }
+
+
+async def bench_inprocess(args) -> dict:
+    os.environ.update(_api_env("http://kakao-stub" + STUB_PATH))
+    sys.path.insert(0, API_DIR)
+    sys.path.insert(0, BASE)
+    import main
+    from kakao_stub import make_app
+
+    stub = make_app(args.latency_ms, args.jitter_ms, args.fail_rate, args.notfound_rate, args.seed)
+    main._kakao_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub))
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app),
+                                     base_url="http://api", timeout=30) as client:
+            return await run_load(client, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server not ready: {url}")
+
+
+async def bench_uvicorn(args) -> dict:
+    stub_port, api_port = _free_port(), _free_port()
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(BASE, "kakao_stub.py"), "--port", str(stub_port),
+         "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+         "--fail-rate", str(args.fail_rate), "--notfound-rate", str(args.notfound_rate),
+         "--seed", str(args.seed)])
+    env = {**os.environ, **_api_env(f"http://127.0.0.1:{stub_port}{STUB_PATH}")}
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(api_port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=API_DIR, env=env)
+    try:
+        _wait_ready(f"http://127.0.0.1:{stub_port}/docs")
+        _wait_ready(f"http://127.0.0.1:{api_port}/")
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", limits=limits,
+                                     timeout=30) as client:
+            return await run_load(client, args)
+    finally:
+        for p in (api, stub):
+            p.terminate()
+        for p in (api, stub):
+            p.wait(timeout=10)
+
+
+# ══════════════════════════════════════════════════════════════
+# 기준(baseline) 저장/비교
+# ══════════════════════════════════════════════════════════════
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_report(result: dict) -> None:
+    print(f"{'endpoint':<10}{'count':>8}{'err':>6}{'rps':>9}{'p50ms':>9}{'p90ms':>9}{'p99ms':>9}{'maxms':>9}")
+    for name, s in [("TOTAL", result["total"])] + list(result["endpoints"].items()):
+        print(f"{name:<10}{s['count']:>8}{s['errors']:>6}{s['rps']:>9}"
+              f"{s['p50_ms']:>9}{s['p90_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """RPS 감소 또는 p50/p99 증가가 tolerance(비율)를 넘으면 회귀로 보고"""
+    regressions = []
+    print(f"\n비교 기준: {baseline.get('meta', {}).get('commit', '?')} "
+          f"({baseline.get('meta', {}).get('created', '?')})")
+    rows = [("TOTAL", result["total"], baseline["total"])]
+    rows += [(k, v, baseline["endpoints"][k]) for k, v in result["endpoints"].items()
+             if k in baseline.get("endpoints", {})]
+    for name, cur, base in rows:
+        for metric, higher_is_worse in (("rps", False), ("p50_ms", True), ("p99_ms", True)):
+            b, c = base[metric], cur[metric]
+            if not b:
+                continue
+            change = (c - b) / b
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            flag = "  ← REGRESSION" if worse else ""
+            print(f"  {name:<10}{metric:<8}{b:>10} → {c:<10} ({change:+.1%}){flag}")
+            if worse:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BlueOcean Finder API load test")
+    ap.add_argument("--mode", choices=("inprocess", "uvicorn"), default="uvicorn")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    ap.add_argument("--duration", type=float, default=20.0, help="측정 구간 (초)")
+    ap.add_argument("--warmup", type=float, default=3.0, help="집계 제외 워밍업 (초)")
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--mix", default="search=0.5,rank=0.4,scatter=0.1")
+    ap.add_argument("--addresses", type=int, default=500, help="검색 주소 풀 크기")
+    ap.add_argument("--zipf", type=float, default=1.0, help="주소 인기도 Zipf 지수 (0: 균등)")
+    ap.add_argument("--max-rank", type=int, default=1035)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="카카오 스텁 평균 지연")
+    ap.add_argument("--jitter-ms", type=float, default=10.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="카카오 스텁 500 응답 비율")
+    ap.add_argument("--notfound-rate", type=float, default=0.0, help="카카오 스텁 결과 없음 비율")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--save", help="결과 JSON 저장 경로 (baseline)")
+    ap.add_argument("--compare", help="비교할 baseline JSON 경로")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="회귀 판정 허용 비율")
+    args = ap.parse_args()
+
+    runner = bench_inprocess if args.mode == "inprocess" else bench_uvicorn
+    result = asyncio.run(runner(args))
+    result["meta"] = {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "args": vars(args),
+    }
+    print_report(result)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.save}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n회귀 {len(regressions)}건: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# smoke.py
+# API 스모크 테스트 — 모든 엔드포인트를 대표 입력으로 1번씩 호출해 상태 코드·응답 형태 확인
+#
+# 리팩터링(공용 헬퍼 변경 등)이 다른 엔드포인트를 조용히 깨뜨리지 않았는지 커밋 전에 확인하는 용도
+# loadtest.py inprocess 모드와 같이 api/main.py를 ASGI로 직접 호출, 카카오는 스텁(kakao_stub.py)으로 대체
+#
+# 실행: python bench/smoke.py   (실패 항목이 있으면 종료 코드 1)
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE)
+
+from loadtest import API_DIR, STUB_PATH, _api_env
+
+# (method, path, JSON body, 기대 상태 코드, 응답 확인 — dict → bool)
+CASES = [
+    ("GET", "/", None, 200, lambda r: r["status"] == "online"),
+    ("GET", "/stats", None, 200, None),
+    ("GET", "/metrics", None, 200, None),
+    ("GET", "/search?address=망원동", None, 200, None),
+    ("GET", "/search?address=서울 마포구 월드컵로 1", None, 200, None),
+    ("POST", "/search/batch", {"addresses": ["안암역", "서울 마포구 월드컵로 1"]}, 200,
+     lambda r: r["count"] == 2 and len(r["results"]) == 2),
+    ("GET", "/locate?lat=37.55&lon=126.91", None, 200, None),
+    ("GET", "/locate?lat=10&lon=10", None, 404, None),
+    ("POST", "/locate/batch", {"points": [[37.55, 126.91]]}, 200,
+     lambda r: r["count"] == 1 and len(r["results"]) == 1),
+    ("POST", "/locate/batch", {"points": [[37.55, 126.91], [37.50, 127.03]]}, 200,
+     lambda r: r["count"] == 2),
+    ("POST", "/locate/batch", {"points": [[37.55, 126.91], [10, 10]]}, 200,
+     lambda r: r["count"] == 2 and r["found"] == 1 and "error" in r["results"][1]),
+    ("GET", "/bbox?min_lat=37.54&min_lon=126.90&max_lat=37.56&max_lon=126.93", None, 200, lambda r: r["count"] > 0),
+    ("GET", "/suggest?q=ㅎㄷ", None, 200, None),
+    ("GET", "/nearby?lat=37.55&lon=126.91&k=5", None, 200, None),
+    ("GET", "/teashops/nearby?lat=37.55&lon=126.92&radius=1000", None, 200, None),
+    ("GET", "/rank/1", None, 200, None),
+    ("GET", "/rank/1?as_of=20244", None, 200, lambda r: r["as_of"] == 20244 and r["ranking"] == 1),
+    ("GET", "/search?address=망원동&as_of=20244", None, 200, lambda r: r["as_of"] == 20244),
+    ("GET", "/rank/1036?as_of=20253", None, 404, None),
+    ("GET", "/ranking?limit=5", None, 200, lambda r: len(r["results"]) == 5),
+    ("GET", "/ranking?as_of=20244&limit=5", None, 200, lambda r: r["as_of"] == 20244),
+    ("GET", "/ranking?as_of=20244&quadrant=Q1&min=unified_score:0.8", None, 200,
+     lambda r: all(x["quadrant"].startswith("Q1") and x["unified_score"] >= 0.8 for x in r["results"])),
+    ("GET", "/ranking?as_of=20253&quadrant=Q1&limit=1", None, 200, lambda r: r["total"] == 380),
+    ("GET", "/ranking/filters", None, 200, lambda r: r["quarters"]),
+    ("GET", "/rescore?w=0.7", None, 200, lambda r: r["results"]),
+    ("GET", "/compare?codes=3001491,3110008", None, 200, lambda r: r["count"] == 2),
+    ("GET", "/history?codes=3001491", None, 200, lambda r: len(r["rank"][0]) == len(r["quarters"])),
+    ("GET", "/scatter", None, 200, None),
+]
+
+
+async def run() -> list:
+    os.environ.update(_api_env("http://kakao-stub" + STUB_PATH))
+    sys.path.insert(0, API_DIR)
+    import main
+    from kakao_stub import make_app
+
+    main._kakao_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=make_app(0, 0)))
+    # 처리되지 않은 예외도 500 응답으로 받아 실패 목록에 기록 (첫 실패에서 중단하지 않음)
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    failures = []
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=30) as client:
+            for method, path, body, status, check in CASES:
+                res = await client.request(method, path, json=body)
+                ok = res.status_code == status
+                if ok and check is not None:
+                    try:
+                        ok = bool(check(res.json()))
+                    except Exception:
+                        ok = False
+                print(f"{'ok  ' if ok else 'FAIL'} {res.status_code} {method} {path}")
+                if not ok:
+                    failures.append((method, path, res.status_code, res.text[:200]))
+    return failures
+
+
+def main():
+    failures = asyncio.run(run())
+    for method, path, code, text in failures:
+        print(f"\n{method} {path} → {code}\n  {text}")
+    print(f"\n{len(CASES) - len(failures)}/{len(CASES)} 통과")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
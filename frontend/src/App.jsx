@@ -23,6 +23,14 @@ const QUADRANT_ORDER = ['Q1_검증시장공백', 'Q2_잠재수요미실현', 'Q4
 
 const getQuadrantColor = (quad) => QUADRANT_META[quad]?.color ?? '#475569';
 
+// /scatter 컬럼형 응답(병렬 배열) → Recharts용 points 배열
+const toScatterData = (d) => ({
+  ...d,
+  points: d.names.map((name, i) => ({
+    상권_코드_명: name, x: d.x[i], y: d.y[i], 사분면: d.quadrant[i], unified_rank: d.rank[i],
+  })),
+});
+
 // 블루오션 여부 hover 설명 컴포넌트 — Portal로 렌더링해 부모 overflow에 잘리지 않음
 const BlueOceanTooltip = () => {
   const [show, setShow] = useState(false);
@@ -153,6 +161,22 @@ const App = () => {
   const pendingAddressRef = useRef('');
 
   const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+  // 정적 JSON(work/43_export_static.py) 경로 — 설정 시 순위 조회·scatter는 API 대신 파일에서 읽음
+  // current.json이 확정(성공/실패)되기 전에는 API로 먼저 요청하지 않음 — 확정 후 한 번만 경로 선택
+  const staticUrl = import.meta.env.VITE_STATIC_URL || '';
+  const [staticBase, setStaticBase] = useState(null);
+  const [staticReady, setStaticReady] = useState(!staticUrl);
+  const staticBaseRef = useRef(null);  // current.json → 버전 경로(실패 시 null) Promise
+
+  useEffect(() => {
+    if (!staticUrl) return;
+    staticBaseRef.current = axios.get(`${staticUrl}/current.json`)
+      .then(r => `${staticUrl}/${r.data.path}`)
+      .catch(() => null);
+    staticBaseRef.current.then(base => { setStaticBase(base); setStaticReady(true); });
+  }, [staticUrl]);
+
+  const scatterUrlFor = useCallback((base) => (base ? `${base}scatter.json` : `${apiUrl}/scatter`), [apiUrl]);
 
   useEffect(() => {
     const checkServer = async () => {
@@ -163,8 +187,9 @@ const App = () => {
   }, [apiUrl]);
 
   useEffect(() => {
-    axios.get(`${apiUrl}/scatter`).then(r => setScatterData(r.data)).catch(() => {});
-  }, [apiUrl]);
+    if (!staticReady) return;
+    axios.get(scatterUrlFor(staticBase)).then(r => setScatterData(toScatterData(r.data))).catch(() => {});
+  }, [staticReady, staticBase, scatterUrlFor]);
 
   // 타이머 정리
   useEffect(() => () => clearInterval(retryTimerRef.current), []);
@@ -180,8 +205,9 @@ const App = () => {
     setLoading(true); setResult(null); setError(null);
     const trimmed = addr.trim();
     const isRank = /^\d+$/.test(trimmed);
+    const base = await staticBaseRef.current;  // 정적 경로 확정까지 대기 (미설정이면 null)
     const url = isRank
-      ? `${apiUrl}/rank/${trimmed}`
+      ? (base ? `${base}rank/${trimmed}.json` : `${apiUrl}/rank/${trimmed}`)
       : `${apiUrl}/search?address=${encodeURIComponent(addr)}`;
     try {
       const response = await axios.get(url);
@@ -190,7 +216,7 @@ const App = () => {
       setResult(response.data);
       setServerStatus('online');
       if (!scatterData) {
-        axios.get(`${apiUrl}/scatter`).then(r => setScatterData(r.data)).catch(() => {});
+        axios.get(scatterUrlFor(base)).then(r => setScatterData(toScatterData(r.data))).catch(() => {});
       }
     } catch (err) {
       const isNetworkError = !err.response;
@@ -211,11 +237,12 @@ const App = () => {
         }, 1000);
       } else {
         setRetrying(false);
-        const msg = err.response?.data?.detail;
+        const msg = err.response?.data?.detail
+          || (isRank && base && err.response?.status === 404 ? `${trimmed}번 순위 상권을 찾을 수 없습니다.` : null);
         setError(msg || '분석 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.');
       }
     } finally { setLoading(false); }
-  }, [apiUrl, scatterData]);
+  }, [apiUrl, scatterUrlFor, scatterData]);
 
   const handleSearch = useCallback(async (e) => {
     e.preventDefault();
@@ -4,8 +4,9 @@
 # 목적: 찻집 데이터의 희소성으로 인한 지표 변동성(점포 1개 차이에 급변)을 해결
 # 방법: 내 상권 지표(70%) + 반경 500m 내 인접 상권 평균 지표(30%) 가중 평균
 # 
-# 입력: 35_blueocean_ranking.csv, api/to_map.csv
+# 입력: 35_blueocean_ranking.csv, api/to_map.csv, 34_oof_residuals.csv
 # 출력: 35_blueocean_ranking_smoothed.csv (최종 안정화 버전)
+#       api/quarterly_residuals.csv (분기별 순위용 입력 — API가 같은 식으로 분기 × 상권 점수 계산)
 
 import pandas as pd
 import numpy as np
@@ -18,6 +19,8 @@ IN_RANK  = os.path.join(BASE, '35_blueocean_ranking.csv')
 IN_MAP   = os.path.join(ROOT, 'api', 'to_map.csv')
 OUT_RANK = os.path.join(BASE, '35_blueocean_ranking_smoothed.csv')
 API_OUT  = os.path.join(ROOT, 'api', 'unified_ranking.csv')
+IN_OOF   = os.path.join(BASE, '34_oof_residuals.csv')
+API_QTR  = os.path.join(ROOT, 'api', 'quarterly_residuals.csv')
 
 print("=== 공간적 평활화(Spatial Smoothing) 프로세스 시작 ===")
 
@@ -80,6 +83,12 @@ final_df = df.drop(columns=['엑스좌표_값', '와이좌표_값'])
 final_df.to_csv(OUT_RANK, index=False, encoding='utf-8-sig')
 final_df.to_csv(API_OUT, index=False, encoding='utf-8-sig') # 백엔드 연동용 서빙 데이터 교체
 
+# 5. 분기별 순위 입력 (9분기 OOF 잔차 + 찻집 수 + 매출) — 점수·순위 계산은 api/scoring.py (score_quarters)
+df_oof = pd.read_csv(IN_OOF, encoding='utf-8-sig')
+quarterly = df_oof[df_oof['상권_코드'].isin(final_df['상권_코드'])][
+    ['상권_코드', '기준_년분기_코드', 'oof_residual', '찻집_수', '당월_매출_금액']]
+quarterly.sort_values(['기준_년분기_코드', '상권_코드']).to_csv(API_QTR, index=False, encoding='utf-8-sig')
+
 print(f"결과 저장 완료: {OUT_RANK}")
-print(f"백엔드 데이터 업데이트 완료: {API_OUT}")
+print(f"백엔드 데이터 업데이트 완료: {API_OUT}, {API_QTR} ({quarterly['기준_년분기_코드'].nunique()}개 분기)")
 print("=== 평활화 완료! 이제 점포 1개 차이에 지표가 흔들리지 않습니다. ===")
@@ -0,0 +1,30 @@
+# 42_build_snapshot.py
+# API 바이너리 스냅샷 생성 — 파이프라인 마지막 단계 (41_add_demand_details.py 이후)
+#
+# 입력: api/unified_ranking.csv, api/to_map.csv, api/teashops.csv, api/station_coords.csv,
+#       api/quarterly_residuals.csv
+# 출력: api/snapshot.bin
+#   - 숫자 컬럼 typed array + 문자열 offset 테이블 + KDTree 입력 좌표 + 사전 직렬화 응답
+#   - API가 시작 시 mmap으로 로드 (pandas/CSV 파싱 없음 → 콜드 스타트 단축)
+#   - 포맷 정의는 api/snapshot.py (API와 공유)
+
+import os, sys, time
+
+BASE = os.path.dirname(__file__)
+ROOT = os.path.dirname(BASE)  # work/ 의 부모 = aicha/
+API_DIR = os.path.join(ROOT, 'api')
+sys.path.insert(0, API_DIR)
+
+import snapshot
+from dataset import build_snapshot
+
+t0 = time.perf_counter()
+out = os.path.join(API_DIR, snapshot.SNAPSHOT_FILE)
+size = build_snapshot(API_DIR, out)
+print(f"CSV 로드 + 정제 + 응답 사전 직렬화: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+t0 = time.perf_counter()
+check = snapshot.read_snapshot(out)
+print(f"스냅샷 로드: {(time.perf_counter() - t0) * 1000:.1f} ms")
+print(f"저장: {out} ({size:,} bytes, version {check['version']}, "
+      f"상권 {len(check['ranking']['상권_코드_명']):,}개)")
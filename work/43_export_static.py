@@ -0,0 +1,26 @@
+# 43_export_static.py
+# 정적 JSON 내보내기 — 42_build_snapshot.py 이후 (데이터가 바뀔 때만 실행)
+#
+# 입력: api/ 데이터 (snapshot.bin 또는 CSV)
+# 출력: frontend/public/static-api/ (또는 인자로 지정한 경로)
+#   - current.json + v{version}/ 아래 rank/{n}, district/{code}, scatter, ranking JSON (+ .gz)
+#   - 프론트엔드는 VITE_STATIC_URL=/static-api 로 빌드하면 순위 조회·scatter를 API 없이 처리
+#   - 포맷 정의는 api/static_export.py
+
+import os, sys, time
+
+BASE = os.path.dirname(__file__)
+ROOT = os.path.dirname(BASE)  # work/ 의 부모 = aicha/
+API_DIR = os.path.join(ROOT, 'api')
+sys.path.insert(0, API_DIR)
+
+from dataset import Dataset
+from static_export import export_static
+
+out = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, 'frontend', 'public', 'static-api')
+
+t0 = time.perf_counter()
+ds = Dataset.load(API_DIR)
+manifest = export_static(ds, out)
+print(f"데이터 로드({ds.source}) + 내보내기: {(time.perf_counter() - t0) * 1000:.0f} ms")
+print(f"저장: {out}/{manifest['path']} (파일 {manifest['files']:,}개, version {manifest['version']})")